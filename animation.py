@@ -0,0 +1,88 @@
+"""Interpolated transitions between two arrangements with the same size.
+
+Normals are interpolated along great circles (slerp), offsets linearly
+beside them, and the geometry of
+every frame is sampled in a single call, so playing an animation only
+copies precomputed arrays into the scene.
+"""
+import numpy as np
+
+from arrangement import Arrangement, RESOLUTION
+
+
+def _unit(normals):
+    normals = np.asarray(normals, dtype=float)
+    norms = np.linalg.norm(normals, axis=-1, keepdims=True)
+    return np.divide(normals, norms, out=np.zeros_like(normals),
+                     where=norms != 0)
+
+
+def slerp(start, end, t):
+    """Normals moving from `start` to `end` (both (N, d)) at times t.
+
+    Returns an array of shape (len(t), N, d). n and -n give the same
+    hyperplane, so each end normal is flipped to the side of its start
+    normal and no plane turns by more than 90 degrees.
+    """
+    start, end = _unit(start), _unit(end)
+    if start.shape != end.shape:
+        raise ValueError('cannot interpolate between %r and %r normals'
+                         % (start.shape, end.shape))
+    dot = np.einsum('ij,ij->i', start, end)
+    end = np.where(dot[:, None] < 0, -end, end)
+    omega = np.arccos(np.clip(np.abs(dot), 0., 1.))[:, None]
+    sin = np.sin(omega)
+    # Nearly equal normals fall back to linear interpolation.
+    close = sin < 1e-6
+    safe = np.where(close, 1., sin)
+    t = np.asarray(t, dtype=float)[:, None, None]
+    w_start = np.where(close, 1 - t, np.sin((1 - t)*omega)/safe)
+    w_end = np.where(close, t, np.sin(t*omega)/safe)
+    return w_start*start + w_end*end
+
+
+def _distances(normals, offsets):
+    # Offsets of the hyperplanes once their normals are made unit.
+    normals = np.asarray(normals, dtype=float)
+    if offsets is None:
+        return np.zeros(len(normals))
+    norms = np.linalg.norm(normals, axis=-1)
+    return np.divide(offsets, norms, out=np.zeros_like(norms),
+                     where=norms != 0)
+
+
+def keyframe_geometry(start, end, frames, resolution=RESOLUTION,
+                      kind='surfaces', start_offsets=None, end_offsets=None):
+    """Geometry of every frame of the transition, computed in one batch.
+
+    `kind` is 'surfaces' or 'lines' (see Arrangement). The offsets b of
+    n . x = b at either end default to 0. Returns the points, shaped
+    (frames, N, res, res, 3) or (frames, N, res, 3), and the (frames, N)
+    visibility mask.
+    """
+    t = np.linspace(0., 1., frames)
+    normals = slerp(start, end, t)
+    count, dim = normals.shape[1:]
+    offsets = None
+    if start_offsets is not None or end_offsets is not None:
+        first = _distances(start, start_offsets)
+        last = _distances(end, end_offsets)
+        # slerp turned these end normals around, and b turns with them.
+        flipped = np.einsum('ij,ij->i', _unit(start), _unit(end)) < 0
+        last = np.where(flipped, -last, last)
+        offsets = ((1 - t)[:, None]*first + t[:, None]*last).reshape(-1)
+    arrangement = Arrangement(normals.reshape(-1, dim), offsets)
+    pts, visible = getattr(arrangement, kind)(resolution=resolution)
+    return (pts.reshape((frames, count) + pts.shape[1:]),
+            visible.reshape(frames, count))
+
+
+def save_frames(images, path, fps=30):
+    """Write a list of RGB images to a GIF or video file with imageio."""
+    try:
+        import imageio
+    except ImportError:
+        raise ImportError('exporting animations needs imageio '
+                          '(pip install imageio, plus imageio-ffmpeg for '
+                          'video)')
+    imageio.mimsave(path, images, fps=fps)
@@ -0,0 +1,458 @@
+"""Pure NumPy geometry for hyperplane arrangements.
+
+Nothing in here imports traits, traitsui or mayavi, so the geometry can be
+computed (and timed) without a GUI stack.
+"""
+import functools
+
+import numpy as np
+
+import combinatorics
+
+EXTENT = 25.
+RESOLUTION = 100
+SPHERE_RESOLUTION = 180
+
+COORDINATE_NORMALS = [[1., 0., 0.], [0., 1., 0.], [0., 0., 1.]]
+TYPE_A_NORMALS = [[1., -1., 0.], [0., 1., -1.], [-1., 0., 1.]]
+TYPE_BD_NORMALS = [[1., 1., 0.], [0., 1., 1.], [1., 0., 1.]]
+
+REFLECTION_ARRANGEMENTS = {
+    'Coordinate Arrangement': COORDINATE_NORMALS,
+    'Type A': TYPE_A_NORMALS,
+    'Type B': COORDINATE_NORMALS + TYPE_A_NORMALS + TYPE_BD_NORMALS,
+    'Type D': TYPE_A_NORMALS + TYPE_BD_NORMALS,
+}
+
+
+# Cached per (radius, resolution) so that switching level of detail back
+# and forth does not redo the trigonometry. The arrays are read-only.
+@functools.lru_cache(maxsize=8)
+def sphere_data(r=EXTENT, resolution=SPHERE_RESOLUTION):
+    theta, phi = np.mgrid[0:np.pi:complex(0, resolution),
+                          0:2*np.pi:complex(0, 2*resolution)]
+    x, y = r*np.sin(theta)*np.cos(phi), r*np.sin(theta)*np.sin(phi)
+    z = r*np.cos(theta)*np.ones_like(phi)
+    for a in (x, y, z):
+        a.setflags(write=False)
+
+    return x, y, z
+
+
+def circle_data(r=EXTENT):
+    theta = np.linspace(0, 2*np.pi, 250)
+    x = r*np.cos(theta)
+    y = r*np.sin(theta)
+    z = np.zeros_like(x)
+
+    return x, y, z
+
+
+def dihedral_arrangement(no_of_lines, r=EXTENT):
+    """The reflection arrangement of the dihedral group of order 2n.
+
+    Returns a dict of arrays: 'points', the 2n points at angles k*pi/n on
+    the circle of radius r; 'lines', the n reflection lines as (n, 2, 2)
+    endpoint pairs; 'normals', their (n, 2) unit normals; and 'wedges',
+    the 2n chambers as (2n, 3, 2) triangles from the origin.
+    """
+    n = no_of_lines
+    angles = np.arange(2*n)*(np.pi/n)
+    points = r*np.column_stack([np.cos(angles), np.sin(angles)])
+    lines = np.stack([points[:n], points[n:]], axis=1)
+    normals = np.column_stack([-np.sin(angles[:n]), np.cos(angles[:n])])
+    wedges = np.zeros((2*n, 3, 2))
+    wedges[:, 1] = points
+    wedges[:, 2] = np.roll(points, -1, axis=0)
+    return {'points': points, 'lines': lines, 'normals': normals,
+            'wedges': wedges}
+
+
+def dihedral_data(no_of_lines):
+    points = dihedral_arrangement(no_of_lines)['points']
+    return points[::2, 0], points[::2, 1], points[1::2, 0], points[1::2, 1]
+
+
+# The sampling grids are shared by every caller, so they are cached per
+# (extent, resolution) and made read-only.
+@functools.lru_cache(maxsize=16)
+def disk_grid(radius=EXTENT, resolution=RESOLUTION):
+    """Polar grid (r cos t, r sin t) covering the disk, shape (2, res, res)."""
+    r, t = np.mgrid[0:radius:complex(0, resolution),
+                    0:2*np.pi:complex(0, resolution)]
+    grid = np.stack([r*np.cos(t), r*np.sin(t)])
+    grid.setflags(write=False)
+    return grid
+
+
+@functools.lru_cache(maxsize=16)
+def rim_grid(radius=EXTENT, resolution=RESOLUTION):
+    """The circle (r cos t, r sin t), closed: shape (2, res)."""
+    t = np.linspace(0., 2*np.pi, resolution)
+    grid = np.stack([radius*np.cos(t), radius*np.sin(t)])
+    grid.setflags(write=False)
+    return grid
+
+
+# The grids with a column of ones appended, so that one matmul both maps
+# them onto each plane (or line) and moves them to its foot point.
+@functools.lru_cache(maxsize=16)
+def _homogeneous(grid, extent, resolution):
+    grid = grid(extent, resolution)
+    flat = grid.reshape(len(grid), -1).T if grid.ndim > 1 else grid[:, None]
+    out = np.column_stack([flat, np.ones(len(flat))])
+    out.setflags(write=False)
+    return out
+
+
+@functools.lru_cache(maxsize=16)
+def line_grid(extent=EXTENT, resolution=RESOLUTION):
+    t = np.linspace(-extent, extent, resolution)
+    t.setflags(write=False)
+    return t
+
+
+def _output(out, shape):
+    if out is None:
+        return np.empty(shape)
+    if out.shape != shape or not out.flags.c_contiguous:
+        raise ValueError('out must be a C-contiguous array of shape %r'
+                         % (shape,))
+    return out
+
+
+def unit_normals(normals):
+    """Unit rows of `normals`, plus the mask of rows that were non-zero."""
+    norms = np.linalg.norm(normals, axis=1, keepdims=True)
+    unit = np.divide(normals, norms, out=np.zeros_like(normals),
+                     where=norms != 0)
+    return unit, norms[:, 0] != 0
+
+
+def plane_bases(normals):
+    """Orthonormal bases (u, v) of the planes with these (N, 3) normals.
+
+    Returns an (N, 2, 3) array. This is the branchless construction of
+    Duff et al. (2017), which is continuous in the normal except where the
+    z component changes sign; a zero normal gets the basis of z = 0.
+    """
+    unit, nonzero = unit_normals(np.asarray(normals, dtype=float))
+    unit[~nonzero] = (0., 0., 1.)
+    x, y, z = unit.T
+    sign = np.copysign(1., z)
+    a = -1./(sign + z)
+    b = x*y*a
+    bases = np.empty((len(unit), 2, 3))
+    bases[:, 0] = np.column_stack([1. + sign*x*x*a, sign*b, -sign*x])
+    bases[:, 1] = np.column_stack([b, sign + y*y*a, -y])
+    return bases
+
+
+def chamber_labels(points, normals):
+    """Number the chambers of a central arrangement met by `points`.
+
+    The signs of every point against every hyperplane are packed into
+    bytes, one row per point, and equal rows get equal labels. Returns the
+    (M,) labels, 0 to count - 1, and the count. Points on a hyperplane
+    count as being on its negative side.
+    """
+    points = np.asarray(points, dtype=float)
+    normals = np.asarray(normals, dtype=float)
+    width = (len(normals) + 7)//8
+    if width == 0:
+        return np.zeros(len(points), dtype=np.intp), 1
+    keys = np.empty((len(points), width), dtype=np.uint8)
+    # Points are done in chunks so the float sign matrix stays small.
+    step = max(1, 2**22//len(normals))
+    for start in range(0, len(points), step):
+        block = points[start:start + step] @ normals.T > 0
+        keys[start:start + step] = np.packbits(block, axis=1)
+    keys = keys.view(np.dtype((np.void, width))).ravel()
+    unique, labels = np.unique(keys, return_inverse=True)
+    return labels.ravel(), len(unique)
+
+
+def slice_basis(dim, seed=0):
+    """A generic 3-space of R^dim and a direction orthogonal to it.
+
+    Returns the (dim, 3) orthonormal basis and the unit (dim,) direction
+    along which the slice is moved. The same seed gives the same slice.
+    """
+    if dim < 4:
+        raise ValueError('slicing needs at least 4 dimensions, got %d' % dim)
+    rng = np.random.default_rng(seed)
+    q, _ = np.linalg.qr(rng.normal(size=(dim, dim)))
+    return q[:, :3], q[:, 3]
+
+
+def spherical_patch(triangles, subdivisions=12, r=EXTENT):
+    """Mesh of spherical triangles given by (T, 3, 3) rays from the origin.
+
+    Each triangle is subdivided on a barycentric grid and pushed out to
+    the sphere of radius r. Returns the (M, 3) points and the triangles.
+    """
+    k = subdivisions
+    i, j = np.nonzero(np.add.outer(np.arange(k + 1), np.arange(k + 1)) <= k)
+    weights = np.column_stack([k - i - j, i, j])/k
+    index = -np.ones((k + 1, k + 1), dtype=int)
+    index[i, j] = np.arange(len(i))
+    a, b = index[:-1, :-1], index[1:, :-1]
+    c, d = index[:-1, 1:], index[1:, 1:]
+    faces = np.concatenate([np.stack([a, b, c], axis=-1).reshape(-1, 3),
+                            np.stack([b, d, c], axis=-1).reshape(-1, 3)])
+    faces = faces[np.all(faces >= 0, axis=1)]
+
+    rays = np.asarray(triangles, dtype=float)
+    rays = rays/np.linalg.norm(rays, axis=2, keepdims=True)
+    points = np.einsum('pk,tkj->tpj', weights, rays)
+    points *= r/np.linalg.norm(points, axis=2, keepdims=True)
+    offsets = len(weights)*np.arange(len(rays))[:, None, None]
+    return points.reshape(-1, 3), (faces[None] + offsets).reshape(-1, 3)
+
+
+def mesh_triangles(count, rows, cols):
+    """Triangles for `count` rows x cols grids stored one after another."""
+    idx = np.arange(count*rows*cols).reshape(count, rows, cols)
+    a, b = idx[:, :-1, :-1], idx[:, 1:, :-1]
+    c, d = idx[:, :-1, 1:], idx[:, 1:, 1:]
+    return np.concatenate([np.stack([a, b, d], axis=-1).reshape(-1, 3),
+                           np.stack([a, d, c], axis=-1).reshape(-1, 3)])
+
+
+def polyline_connections(count, length):
+    """Segments joining `count` polylines of `length` points each."""
+    idx = np.arange(count*length).reshape(count, length)
+    return np.stack([idx[:, :-1], idx[:, 1:]], axis=-1).reshape(-1, 2)
+
+
+class Arrangement(object):
+    """The hyperplanes n_i . x = b_i given by (N, d) normals and offsets.
+
+    Without offsets the arrangement is central. Regions and the
+    characteristic polynomial of an affine arrangement are found through
+    its cone; the intersection lattice needs a central one.
+    """
+
+    def __init__(self, normals, offsets=None):
+        normals = np.array(normals, dtype=float, order='C', ndmin=2)
+        if normals.ndim != 2 or normals.shape[1] == 0:
+            raise ValueError('normals must be an (N, d) array, got shape %r'
+                             % (normals.shape,))
+        if offsets is None:
+            offsets = np.zeros(len(normals))
+        offsets = np.array(offsets, dtype=float, ndmin=1)
+        if offsets.shape != (len(normals),):
+            raise ValueError('expected %d offsets, got shape %r'
+                             % (len(normals), offsets.shape))
+        self.normals = normals
+        self.offsets = offsets
+
+    def __len__(self):
+        return self.normals.shape[0]
+
+    @property
+    def dim(self):
+        return self.normals.shape[1]
+
+    def _components(self, count):
+        if self.dim < count:
+            raise ValueError('need normals in at least %d dimensions, got %d'
+                             % (count, self.dim))
+        return [self.normals[:, i] for i in range(count)]
+
+    def _central(self):
+        if np.any(self.offsets):
+            raise ValueError('only defined for central arrangements')
+        return self.normals
+
+    def _feet(self, count):
+        # Unit normals of the first `count` coordinates, and the signed
+        # distance of each hyperplane from the origin along them.
+        self._components(count)
+        normals = self.normals[:, :count]
+        unit, nonzero = unit_normals(normals)
+        norms = np.linalg.norm(normals, axis=1)
+        distance = np.divide(self.offsets, norms, out=np.zeros_like(norms),
+                             where=nonzero)
+        return unit, distance, nonzero
+
+    def slice(self, basis, point):
+        """Restriction to the affine subspace point + span(basis).
+
+        The result lives in the coordinates y of x = point + basis @ y.
+        """
+        return Arrangement(self.normals @ basis,
+                           self.offsets - self.normals @ point)
+
+    def surfaces(self, extent=EXTENT, resolution=RESOLUTION, out=None):
+        """Sample every plane where it meets the ball of radius `extent`.
+
+        Returns the (N, res, res, 3) points, on a polar grid, and an (N,)
+        mask that is False for zero normals and planes missing the ball.
+        The points are written into `out` when given. Every plane goes
+        through the same matmul with an orthonormal basis of itself,
+        scaled to the radius of its disk, so nearly vertical planes stay
+        inside the ball.
+        """
+        pts = _output(out, (len(self), resolution, resolution, 3))
+        return pts, self._on_planes(disk_grid, extent, resolution, pts)
+
+    def circles(self, extent=EXTENT, resolution=RESOLUTION, out=None):
+        """The circles where the planes meet the sphere of radius `extent`.
+
+        Returns (N, res, 3) closed polylines (the last point repeats the
+        first), great circles for planes through the origin, and the
+        visibility mask of surfaces(). They are the rims of the disks that
+        surfaces() samples, so they come from the same single matmul.
+        """
+        pts = _output(out, (len(self), resolution, 3))
+        return pts, self._on_planes(rim_grid, extent, resolution, pts)
+
+    def _on_planes(self, grid, extent, resolution, pts):
+        # Map a cached grid in the disk of radius `extent` onto every
+        # plane's own disk in the ball, scaled by the disk's radius.
+        unit, distance, nonzero = self._feet(3)
+        radius = np.sqrt(np.maximum(extent**2 - distance**2, 0.))/extent
+        coeffs = np.empty((len(self), 3, 3))
+        coeffs[:, :2] = plane_bases(self.normals[:, :3])*radius[:, None, None]
+        coeffs[:, 2] = distance[:, None]*unit
+        np.matmul(_homogeneous(grid, extent, resolution), coeffs,
+                  out=pts.reshape(len(self), -1, 3))
+        return nonzero & (np.abs(distance) < extent)
+
+    def lines(self, extent=EXTENT, resolution=RESOLUTION, out=None):
+        """The lines n_x*x + n_y*y = b in the z = 0 plane, (N, res, 3).
+
+        Each line is sampled along its unit direction over its chord of
+        the disk of radius `extent`.
+        """
+        unit, distance, nonzero = self._feet(2)
+        pts = _output(out, (len(self), resolution, 3))
+        half = np.sqrt(np.maximum(extent**2 - distance**2, 0.))/extent
+        coeffs = np.zeros((len(self), 2, 3))
+        coeffs[:, 0, 0] = -unit[:, 1]*half
+        coeffs[:, 0, 1] = unit[:, 0]*half
+        coeffs[:, 1, :2] = distance[:, None]*unit
+
+        np.matmul(_homogeneous(line_grid, extent, resolution), coeffs,
+                  out=pts)
+        visible = nonzero & (np.abs(distance) < extent)
+
+        return pts, visible
+
+    def signs(self, points):
+        """Sign vectors, (M, N) int8, of points (M, d) against each plane."""
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        return np.sign(points @ self.normals.T - self.offsets).astype(np.int8)
+
+    def pick(self, origin, direction, extent=EXTENT):
+        """The first hyperplane met by the ray origin + t*direction, t > 0.
+
+        All hyperplanes are intersected at once and only hits inside the
+        ball of radius `extent` count. Returns the index of the hyperplane
+        (-1 if none is hit), the hit point, and a point on the ray just
+        before the hit, inside the region seen from the origin; classify
+        it with signs().
+        """
+        origin = np.asarray(origin, dtype=float)
+        direction = np.asarray(direction, dtype=float)
+        direction = direction/np.linalg.norm(direction)
+        along = self.normals @ direction
+        t = np.divide(self.offsets - self.normals @ origin, along,
+                      out=np.full(len(self), np.inf), where=along != 0)
+        hits = origin + t[:, None]*direction
+        ok = (t > 0) & (np.linalg.norm(hits, axis=1) <= extent)
+        if not ok.any():
+            return -1, None, None
+        index = int(np.argmin(np.where(ok, t, np.inf)))
+        before = origin + (t[index] - 1e-6*extent)*direction
+        return index, hits[index], before
+
+    def regions(self, check=False):
+        """Sign vectors and interior points of the regions."""
+        return combinatorics.regions(self.normals, check, self.offsets)
+
+    def bounded(self, signs):
+        """Mask of the regions with these sign vectors that are bounded."""
+        return combinatorics.bounded(self.normals, signs)
+
+    def characteristic_polynomial(self):
+        return combinatorics.characteristic_polynomial(self.normals,
+                                                       self.offsets)
+
+    def bounded_mesh(self, shrink=0.9):
+        """The bounded regions as one triangle mesh, in R^2 or R^3.
+
+        Returns (M, 3) points, (T, 3) triangles and the (M,) index of the
+        bounded region each point belongs to. A region's vertices are the
+        vertices of the arrangement whose signs never disagree with its
+        own; in R^3 the ones on each wall form a face. Every polygon is
+        ordered by angle around its centroid and fanned into triangles,
+        all groups at once. Each region is shrunk towards its centroid by
+        `shrink` so neighbours sharing a face do not overlap.
+        """
+        dim = self.dim
+        if dim not in (2, 3):
+            raise ValueError('bounded regions can only be meshed in R^2 or '
+                             'R^3, not R^%d' % dim)
+        signs, _ = self.regions()
+        signs = signs[self.bounded(signs)]
+        corners = combinatorics.vertices(self.normals, self.offsets)
+        values = corners @ self.normals.T - self.offsets
+        on = np.abs(values) < 10.**-combinatorics.DECIMALS
+        corner_signs = np.where(on, 0, np.sign(values)).astype(np.int8)
+        region, corner = [], []
+        step = max(1, 2**22//max(corner_signs.size, 1))
+        for start in range(0, len(signs), step):
+            block = signs[start:start + step]
+            r, c = np.nonzero(np.all(block[:, None, :]*corner_signs[None]
+                                     >= 0, axis=2))
+            region.append(r + start)
+            corner.append(c)
+        region = np.concatenate(region) if region else np.zeros(0, np.intp)
+        corner = np.concatenate(corner) if corner else np.zeros(0, np.intp)
+        centroids = np.zeros((len(signs), dim))
+        np.add.at(centroids, region, corners[corner])
+        centroids /= np.maximum(np.bincount(region, minlength=len(signs)),
+                                1)[:, None]
+
+        if dim == 3:
+            # One polygon per (region, wall): the region's corners on it.
+            incidence, plane = np.nonzero(on[corner])
+            region, corner = region[incidence], corner[incidence]
+            group = region*len(self) + plane
+            bases = plane_bases(self.normals)[plane]
+        else:
+            group = region
+            bases = np.broadcast_to(np.eye(2), (len(region), 2, 2))
+        _, group, sizes = np.unique(group, return_inverse=True,
+                                    return_counts=True)
+        group = group.ravel()
+        faces = sizes >= dim
+        keep = faces[group]
+        region, corner, group, bases = (region[keep], corner[keep],
+                                        group[keep], bases[keep])
+        centres = np.zeros((len(sizes), dim))
+        np.add.at(centres, group, corners[corner])
+        centres /= np.maximum(sizes, 1)[:, None]
+        offset = np.einsum('mij,mj->mi', bases, corners[corner]
+                           - centres[group])
+        order = np.lexsort((np.arctan2(offset[:, 1], offset[:, 0]), group))
+        region, corner, group = region[order], corner[order], group[order]
+
+        sizes = np.bincount(group, minlength=len(sizes))
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        fans = np.maximum(sizes - 2, 0)
+        owner = np.repeat(np.arange(len(sizes)), fans)
+        step = (np.arange(fans.sum())
+                - np.repeat(np.cumsum(fans) - fans, fans) + 1)
+        first = starts[owner]
+        triangles = np.column_stack([first, first + step, first + step + 1])
+
+        points = np.zeros((len(corner), 3))
+        points[:, :dim] = (centroids[region]
+                           + shrink*(corners[corner] - centroids[region]))
+        return points, triangles, region
+
+    def lattice(self):
+        return combinatorics.IntersectionLattice(self._central())
@@ -0,0 +1,403 @@
+"""Backends that draw the batched arrangement geometry.
+
+Every backend draws the same arrays: planes as (N, res, res, 3) grids,
+joined into one triangle mesh, or lines as (N, res, 3) polylines. A
+backend's own libraries are only imported when it is created, so the
+light ones work (and start quickly) without VTK or Qt:
+
+    mayavi      VTK through mlab, offscreen; png, svg
+    matplotlib  mplot3d on the Agg canvas; png, svg, pdf
+    html        a three.js page, loaded from a CDN; html
+
+`python backends.py` prints how long each backend takes to import and
+create in a fresh interpreter.
+"""
+import base64
+import json
+import os
+import string
+import subprocess
+import sys
+
+import numpy as np
+
+from animation import save_frames
+from arrangement import EXTENT, RESOLUTION
+from arrangement import mesh_triangles, polyline_connections
+
+
+def default_view(pts):
+    """(azimuth, elevation) in degrees, as for mlab.view: planes are seen
+    from above at an angle, lines in the z = 0 plane from straight above."""
+    return (45., 60.) if pts.ndim == 4 else (0., 0.)
+
+
+class Backend(object):
+    """One scene showing planes or lines, written out as a file."""
+
+    name = None
+    formats = ()
+    animation_format = 'gif'
+    # Grid resolution the backend can draw at a usable speed.
+    resolution = RESOLUTION
+
+    def __init__(self, size=(800, 600)):
+        self.size = tuple(size)
+
+    def show(self, pts, view=None):
+        """Draw planes (4-d pts) or lines (3-d pts) in place of the last.
+
+        `view` is (azimuth, elevation) in degrees; None keeps the camera.
+        """
+        raise NotImplementedError
+
+    def save(self, path):
+        raise NotImplementedError
+
+    def screenshot(self):
+        raise NotImplementedError('the %s backend cannot take screenshots'
+                                  % self.name)
+
+    def save_animation(self, frames, path, fps=30, view=None):
+        """Show each of `frames` (stacked pts) and save them as a movie."""
+        images = []
+        for i, frame in enumerate(frames):
+            self.show(frame, view if i == 0 else None)
+            images.append(self.screenshot())
+        save_frames(images, path, fps=fps)
+
+
+class MayaviBackend(Backend):
+    """An offscreen mlab figure whose actors are reused from scene to scene."""
+
+    name = 'mayavi'
+    formats = ('png', 'svg')
+
+    def __init__(self, size=(800, 600)):
+        super().__init__(size)
+        from mayavi import mlab
+        mlab.options.offscreen = True
+        self.mlab = mlab
+        self.figure = mlab.figure(size=self.size, bgcolor=(1, 1, 1))
+        self.planes = None
+        self.lines = None
+
+    def _set_planes(self, pts):
+        count, rows, cols, _ = pts.shape
+        flat = pts.reshape(-1, 3)
+        if self.planes is None:
+            self.planes = self.mlab.triangular_mesh(
+                flat[:, 0], flat[:, 1], flat[:, 2],
+                mesh_triangles(count, rows, cols), figure=self.figure)
+        elif len(self.planes.mlab_source.points) == len(flat):
+            self.planes.mlab_source.points[:] = flat
+            self.planes.mlab_source.update()
+        else:
+            self.planes.mlab_source.reset(
+                x=flat[:, 0], y=flat[:, 1], z=flat[:, 2],
+                triangles=mesh_triangles(count, rows, cols))
+
+    def _set_lines(self, pts):
+        count, length, _ = pts.shape
+        flat = pts.reshape(-1, 3)
+        if self.lines is None:
+            mlab = self.mlab
+            source = mlab.pipeline.scalar_scatter(
+                flat[:, 0], flat[:, 1], flat[:, 2], figure=self.figure)
+            source.mlab_source.dataset.lines = polyline_connections(count,
+                                                                    length)
+            source.update()
+            tube = mlab.pipeline.tube(source, tube_radius=0.7)
+            self.lines = mlab.pipeline.surface(tube, color=(1, 0, 0))
+        elif len(self.lines.mlab_source.points) == len(flat):
+            self.lines.mlab_source.points[:] = flat
+            self.lines.mlab_source.update()
+        else:
+            source = self.lines.mlab_source
+            source.reset(x=flat[:, 0], y=flat[:, 1], z=flat[:, 2])
+            source.dataset.lines = polyline_connections(count, length)
+            source.update()
+
+    def show(self, pts, view=None):
+        scene = self.figure.scene
+        scene.disable_render = True
+        try:
+            if pts.ndim == 4:
+                self._set_planes(pts)
+                shown, hidden = self.planes, self.lines
+            else:
+                self._set_lines(pts)
+                shown, hidden = self.lines, self.planes
+            if hidden is not None:
+                hidden.visible = False
+            shown.visible = True
+            if view is not None:
+                self.mlab.view(*view, distance='auto',
+                               focalpoint=(0, 0, 0), figure=self.figure)
+        finally:
+            scene.disable_render = False
+
+    def save(self, path):
+        self.mlab.savefig(path, figure=self.figure)
+
+    def screenshot(self):
+        return self.mlab.screenshot(figure=self.figure)
+
+
+class MatplotlibBackend(Backend):
+    """mplot3d on an Agg canvas: no display, no VTK."""
+
+    name = 'matplotlib'
+    formats = ('png', 'svg', 'pdf')
+    # mplot3d depth-sorts every polygon in Python.
+    resolution = 20
+
+    def __init__(self, size=(800, 600), dpi=100):
+        super().__init__(size)
+        from matplotlib import colormaps
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from mpl_toolkits.mplot3d.art3d import Line3DCollection
+        from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+        self._polygons = Poly3DCollection
+        self._segments = Line3DCollection
+        self._colours = colormaps['tab10']
+        self.figure = Figure(figsize=(self.size[0]/dpi, self.size[1]/dpi),
+                             dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        self.axes = self.figure.add_axes((0., 0., 1., 1.), projection='3d')
+        for limits in ('set_xlim', 'set_ylim', 'set_zlim'):
+            getattr(self.axes, limits)(-EXTENT, EXTENT)
+        self.axes.set_box_aspect((1, 1, 1), zoom=1.4)
+        self.axes.set_axis_off()
+        self.artist = None
+
+    def show(self, pts, view=None):
+        if self.artist is not None:
+            self.artist.remove()
+        flat = pts.reshape(-1, 3)
+        if pts.ndim == 4:
+            count, rows, cols, _ = pts.shape
+            triangles = mesh_triangles(count, rows, cols)
+            # One colour per plane; mesh_triangles lists each plane's
+            # triangles in two blocks of (rows - 1)*(cols - 1).
+            plane = (np.arange(len(triangles)) % (len(triangles)//2)
+                     // ((rows - 1)*(cols - 1)))
+            colours = self._colours(plane % 10/10.)
+            colours[:, 3] = 0.6
+            self.artist = self._polygons(flat[triangles],
+                                         facecolors=colours,
+                                         edgecolor='none')
+        else:
+            self.artist = self._segments(
+                flat[polyline_connections(*pts.shape[:2])],
+                colors=[(1., 0., 0.)], linewidths=2.)
+        self.axes.add_collection3d(self.artist)
+        if view is not None:
+            azimuth, elevation = view
+            # mlab measures the elevation from the z axis, mplot3d from
+            # the x-y plane.
+            self.axes.view_init(elev=90. - elevation, azim=azimuth)
+
+    def save(self, path):
+        self.figure.savefig(path)
+
+    def screenshot(self):
+        self.figure.canvas.draw()
+        return np.asarray(self.figure.canvas.buffer_rgba())[..., :3].copy()
+
+
+# The page loads three.js from HTMLBackend.three_url, so it needs network
+# access unless that points at a local copy. The geometry itself is
+# embedded as base64 little-endian float32 positions (one block per frame)
+# and uint32 indices, exactly the merged arrays the other backends draw.
+HTML_TEMPLATE = string.Template('''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>body { margin: 0; overflow: hidden; background: #fff; }</style>
+<script type="importmap">
+{"imports": {
+  "three": "${three}build/three.module.js",
+  "three/addons/": "${three}examples/jsm/"
+}}
+</script>
+</head>
+<body>
+<script type="module">
+import * as THREE from 'three';
+import {OrbitControls} from 'three/addons/controls/OrbitControls.js';
+
+const data = $data;
+function decode(text, Type) {
+  const bytes = Uint8Array.from(atob(text), c => c.charCodeAt(0));
+  return new Type(bytes.buffer);
+}
+const frames = decode(data.frames, Float32Array);
+const size = frames.length/data.count;
+
+const renderer = new THREE.WebGLRenderer({antialias: true});
+renderer.setSize(window.innerWidth, window.innerHeight);
+renderer.setClearColor(0xffffff);
+document.body.appendChild(renderer.domElement);
+const scene = new THREE.Scene();
+const camera = new THREE.PerspectiveCamera(
+  30, window.innerWidth/window.innerHeight, 1, 1000);
+camera.up.set(0, 0, 1);
+camera.position.fromArray(data.camera);
+camera.add(new THREE.DirectionalLight(0xffffff, 2));
+scene.add(camera, new THREE.AmbientLight(0xffffff, 1));
+const controls = new OrbitControls(camera, renderer.domElement);
+
+const geometry = new THREE.BufferGeometry();
+const position = new THREE.BufferAttribute(frames.slice(0, size), 3);
+geometry.setAttribute('position', position);
+geometry.setIndex(new THREE.BufferAttribute(decode(data.index, Uint32Array),
+                                            1));
+const planes = data.kind === 'planes';
+if (planes) {
+  geometry.computeVertexNormals();
+  scene.add(new THREE.Mesh(geometry, new THREE.MeshPhongMaterial(
+    {color: 0x8099e6, side: THREE.DoubleSide, transparent: true,
+     opacity: 0.7})));
+} else {
+  scene.add(new THREE.LineSegments(geometry, new THREE.LineBasicMaterial(
+    {color: 0xff0000})));
+}
+
+let frame = 0, last = 0;
+function draw(time) {
+  if (data.count > 1 && time - last > 1000/data.fps) {
+    frame = (frame + 1) % data.count;
+    position.array.set(frames.subarray(frame*size, (frame + 1)*size));
+    position.needsUpdate = true;
+    if (planes) geometry.computeVertexNormals();
+    last = time;
+  }
+  controls.update();
+  renderer.render(scene, camera);
+  requestAnimationFrame(draw);
+}
+window.addEventListener('resize', () => {
+  camera.aspect = window.innerWidth/window.innerHeight;
+  camera.updateProjectionMatrix();
+  renderer.setSize(window.innerWidth, window.innerHeight);
+});
+requestAnimationFrame(draw);
+</script>
+</body>
+</html>
+''')
+
+
+def _base64(array, dtype):
+    return base64.b64encode(np.ascontiguousarray(array, dtype=dtype)
+                            .tobytes()).decode('ascii')
+
+
+class HTMLBackend(Backend):
+    """A WebGL page (three.js) built from the merged arrays.
+
+    The arrays are embedded in the page, but three.js itself is loaded
+    from `three_url`: the jsDelivr CDN unless set to (a URL relative to
+    the page of) a local copy of the three package, e.g. 'three/'.
+    Without network access or such a copy the page stays blank.
+    Animations are kept as one page too: every frame's points are
+    embedded and the page swaps them in at the given rate.
+    """
+
+    name = 'html'
+    formats = ('html',)
+    animation_format = 'html'
+    resolution = 50
+    three_url = 'https://cdn.jsdelivr.net/npm/three@0.160.0/'
+
+    def __init__(self, size=(800, 600)):
+        super().__init__(size)
+        self.frames = None
+        self.fps = 30
+        self.view = None
+
+    def show(self, pts, view=None):
+        self.frames = pts[None]
+        if view is not None:
+            self.view = view
+
+    def save(self, path):
+        frames = self.frames
+        planes = frames.ndim == 5
+        if planes:
+            index = mesh_triangles(*frames.shape[1:4])
+        else:
+            index = polyline_connections(*frames.shape[1:3])
+        azimuth, elevation = np.radians(self.view or
+                                        default_view(frames[0]))
+        camera = 4*EXTENT*np.array([np.sin(elevation)*np.cos(azimuth),
+                                    np.sin(elevation)*np.sin(azimuth),
+                                    np.cos(elevation)])
+        data = {'kind': 'planes' if planes else 'lines',
+                'count': len(frames), 'fps': self.fps,
+                'camera': camera.tolist(),
+                'frames': _base64(frames, '<f4'),
+                'index': _base64(index, '<u4')}
+        with open(path, 'w') as f:
+            f.write(HTML_TEMPLATE.substitute(
+                title=os.path.splitext(os.path.basename(path))[0],
+                three=self.three_url, data=json.dumps(data)))
+
+    def save_animation(self, frames, path, fps=30, view=None):
+        self.frames = np.asarray(frames)
+        self.fps = fps
+        if view is not None:
+            self.view = view
+        self.save(path)
+        self.fps = 30
+
+
+BACKENDS = {
+    'mayavi': MayaviBackend,
+    'matplotlib': MatplotlibBackend,
+    'html': HTMLBackend,
+}
+
+
+def get_backend(name, size=(800, 600)):
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError('unknown backend %r, expected one of %s'
+                         % (name, ', '.join(BACKENDS)))
+    return backend(size)
+
+
+def import_time(name):
+    """Seconds a fresh interpreter takes to import and create `name`.
+
+    Raises ImportError when the backend's libraries are missing.
+    """
+    code = ('import time\n'
+            'start = time.perf_counter()\n'
+            'import backends\n'
+            'backends.get_backend(%r, (320, 240))\n'
+            'print(time.perf_counter() - start)\n' % name)
+    result = subprocess.run([sys.executable, '-c', code],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        raise ImportError('the %s backend is not available: %s'
+                          % (name, error[-1] if error else 'failed'))
+    return float(result.stdout.split()[-1])
+
+
+def main():
+    for name in BACKENDS:
+        try:
+            print('%-12s %8.3f s' % (name, import_time(name)))
+        except ImportError as error:
+            print('%-12s %s' % (name, error))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Import time of every rendering backend, and the time each available one
+takes to draw and save the B3 arrangement."""
+import os
+import sys
+import tempfile
+
+from harness import measure, report
+from arrangement import Arrangement
+from backends import BACKENDS, default_view, get_backend, import_time
+from root_systems import reflecting_hyperplanes
+
+
+def run():
+    results = []
+    available = []
+    for name in BACKENDS:
+        try:
+            seconds = [import_time(name) for _ in range(3)]
+        except ImportError as error:
+            print('skipped: %s' % error)
+            continue
+        available.append(name)
+        results.append({'name': 'import', 'params': {'backend': name},
+                        'min': min(seconds),
+                        'median': sorted(seconds)[1], 'repeat': 3,
+                        'number': 1})
+
+    arrangement = Arrangement(reflecting_hyperplanes('B', 3))
+    with tempfile.TemporaryDirectory() as folder:
+        for name in available:
+            backend = get_backend(name)
+            pts, _ = arrangement.surfaces(resolution=backend.resolution)
+            path = os.path.join(folder, 'b3.' + backend.formats[0])
+
+            def draw():
+                backend.show(pts, view=default_view(pts))
+                backend.save(path)
+            timing = measure(draw, repeat=3)
+            timing.update(name='show_and_save',
+                          params={'backend': name, 'n': len(arrangement),
+                                  'res': backend.resolution})
+            results.append(timing)
+    return results
+
+
+def main(argv):
+    report(run(), argv[1] if len(argv) > 1 else None)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,101 @@
+"""The NumPy geometry behind every Vis drawing, by size and resolution.
+
+The plane cases are the ones the old edit_plane_k ladder told apart:
+a generic normal, norm_z == 0, norm_z == norm_y == 0, and lines in 2D.
+"""
+import sys
+
+import numpy as np
+
+from harness import measure, report
+from arrangement import Arrangement, chamber_labels
+from arrangement import sphere_data, circle_data, dihedral_data
+from incremental import Layer
+from root_systems import reflecting_hyperplanes
+
+PLANE_CASES = {
+    'generic': (1., 2., 3.),
+    'norm_z_zero': (1., 2., 0.),
+    'norm_y_zero': (1., 0., 0.),
+}
+
+
+def run():
+    results = []
+
+    def add(name, fn, params, repeat=5):
+        timing = measure(fn, repeat=repeat)
+        timing.update(name=name, params=params)
+        results.append(timing)
+
+    # sphere_data is cached; time the computation underneath.
+    for resolution in (45, 90, 180):
+        add('sphere_data', lambda: sphere_data.__wrapped__(
+            resolution=resolution), {'res': resolution})
+    add('circle_data', circle_data, {})
+    for n in (3, 50, 1000, 5000):
+        add('dihedral_data', lambda: dihedral_data(n), {'n': n})
+
+    for count in (4, 32, 256):
+        for resolution in (25, 100, 200):
+            out = np.empty((count, resolution, resolution, 3))
+            for case, normal in PLANE_CASES.items():
+                arrangement = Arrangement(np.tile(normal, (count, 1)))
+                add('surfaces', lambda: arrangement.surfaces(
+                    resolution=resolution, out=out),
+                    {'case': case, 'n': count, 'res': resolution})
+            arrangement = Arrangement(np.tile((1., 2.), (count, 1)))
+            lines = np.empty((count, resolution, 3))
+            add('lines', lambda: arrangement.lines(resolution=resolution,
+                                                   out=lines),
+                {'n': count, 'res': resolution})
+
+    circle_rng = np.random.default_rng(1)
+    for count in (9, 100, 1000):
+        arrangement = Arrangement(circle_rng.normal(size=(count, 3)))
+        circles = np.empty((count, 181, 3))
+        add('circles', lambda: arrangement.circles(resolution=181,
+                                                   out=circles),
+            {'n': count, 'res': 181})
+
+    # Redrawing after one normal changed to a new value, through a Layer,
+    # against recomputing every plane.
+    layer_rng = np.random.default_rng(2)
+    for count in (32, 256):
+        normals = layer_rng.normal(size=(count, 3))
+        buffer = np.empty((count, 100, 100, 3))
+        layer = Layer('surfaces')
+        layer.update(Arrangement(normals), buffer)
+
+        def edit_one():
+            normals[count//2] = layer_rng.normal(size=3)
+            layer.update(Arrangement(normals), buffer)
+        add('layer_update', edit_one, {'n': count, 'res': 100,
+                                       'changed': 1})
+        arrangement = Arrangement(normals)
+        add('surfaces', lambda: arrangement.surfaces(out=buffer),
+            {'case': 'random', 'n': count, 'res': 100})
+
+    rng = np.random.default_rng(0)
+    for count in (10, 100, 1000):
+        arrangement = Arrangement(rng.normal(size=(count, 3)))
+        add('pick', lambda: arrangement.pick((60., 40., 30.),
+                                             (-60., -41., -29.)),
+            {'n': count})
+
+    for family, n in (('A', 2), ('B', 3), ('H', 3)):
+        normals = reflecting_hyperplanes(family, n)
+        for resolution in (45, 180):
+            x, y, z = sphere_data(resolution=resolution)
+            points = np.column_stack([x.ravel(), y.ravel(), z.ravel()])
+            add('chamber_labels', lambda: chamber_labels(points, normals),
+                {'type': '%s%d' % (family, n), 'res': resolution})
+    return results
+
+
+def main(argv):
+    report(run(), argv[1] if len(argv) > 1 else None)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,38 @@
+"""Intersection lattice construction for random and reflection arrangements."""
+import sys
+
+import numpy as np
+
+from harness import measure, report
+from combinatorics import IntersectionLattice, characteristic_polynomial
+from root_systems import reflecting_hyperplanes
+
+
+def run():
+    rng = np.random.default_rng(0)
+    cases = [('random', {'d': dim, 'n': count}, rng.normal(size=(count, dim)))
+             for dim in (3, 4) for count in (10, 20, 40)]
+    cases += [('reflection', {'type': '%s%d' % (family, n)},
+               reflecting_hyperplanes(family, n))
+              for family, n in (('A', 3), ('B', 3), ('D', 4), ('F', 4),
+                                ('H', 4))]
+    results = []
+    for name, params, normals in cases:
+        lattice = IntersectionLattice(normals)
+        if np.any(lattice.characteristic_polynomial()
+                  != characteristic_polynomial(normals)):
+            raise RuntimeError('%s %r: lattice and deletion-restriction '
+                               'disagree' % (name, params))
+        params = dict(params, flats=len(lattice))
+        timing = measure(lambda: IntersectionLattice(normals), repeat=3)
+        timing.update(name='lattice_' + name, params=params)
+        results.append(timing)
+    return results
+
+
+def main(argv):
+    report(run(), argv[1] if len(argv) > 1 else None)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,104 @@
+"""Vis observers end to end, from a trait change to the redrawn scene.
+
+Runs offscreen. The scheduler is swapped for one without invoke_later so
+every change is applied before the timer stops.
+"""
+import os
+import sys
+
+from harness import measure, report
+from bench_geometry import PLANE_CASES
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+def open_vis():
+    from pyface.api import GUI
+    from project_script_18B030023 import Vis
+    from scheduler import UpdateScheduler
+
+    gui = GUI()
+    vis = Vis()
+    ui = vis.edit_traits()
+    while vis.engine is None:
+        gui.process_events()
+    vis.scheduler = UpdateScheduler(vis._apply)
+    vis.adaptive_detail = False
+    return vis, ui
+
+
+def run():
+    from project_script_18B030023 import Hyperplane, SLICED_TYPES
+
+    vis, ui = open_vis()
+    results = []
+
+    def add(name, fn, params, repeat=5):
+        timing = measure(fn, repeat=repeat)
+        timing.update(name=name, params=params)
+        results.append(timing)
+
+    for resolution in (25, 100, 200):
+        vis.resolution = resolution
+        for count in (4, 32):
+            for case, normal in PLANE_CASES.items():
+                vis.hyperplanes = [Hyperplane(show=True) for _ in range(count)]
+
+                def edit():
+                    # Nudge one component so the observer always fires.
+                    plane = vis.hyperplanes[0]
+                    plane.norm_x = -plane.norm_x
+                    for plane in vis.hyperplanes:
+                        plane.trait_set(norm_x=normal[0], norm_y=normal[1],
+                                        norm_z=normal[2])
+
+                add('edit_planes', edit,
+                    {'case': case, 'n': count, 'res': resolution})
+            vis.dim = '2'
+            add('edit_planes', edit,
+                {'case': '2d', 'n': count, 'res': resolution})
+            vis.dim = '3'
+    vis.resolution = 100
+
+    # One row edited out of many, as from the table, with adaptive detail
+    # on; a fresh value each time so the row cache always misses.
+    vis.adaptive_detail = True
+    for count in (32, 200):
+        vis.hyperplanes = [Hyperplane(norm_x=1. + i, show=True)
+                           for i in range(count)]
+        nudges = iter(range(1, 10**6))
+
+        def edit_one():
+            vis.hyperplanes[count//2].norm_y = next(nudges)*1e-3
+
+        add('edit_one_plane', edit_one, {'n': count}, repeat=20)
+    vis.adaptive_detail = False
+
+    vis.ira = True
+    types = vis.trait('refl_arr_type').trait_type.values
+    for name in types:
+        others = [other for other in types if other != name]
+
+        def switch():
+            vis.refl_arr_type = others[0]
+            vis.refl_arr_type = name
+
+        add('refl_arr', switch, {'type': name})
+        if name not in SLICED_TYPES:
+            vis.refl_arr_type = name
+
+            def toggle():
+                vis.view_cox = not vis.view_cox
+                vis.view_cox = not vis.view_cox
+
+            add('cox_cell', toggle, {'type': name})
+    ui.dispose()
+    return results
+
+
+def main(argv):
+    report(run(), argv[1] if len(argv) > 1 else None)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,54 @@
+"""Plane sampling: the old per-plane branch ladder against plane bases.
+
+The legacy version solves z = f(x, y) (or y = f(x), or x = 0) one plane
+at a time over the square grid, as edit_plane_k used to. Besides the time,
+the largest coordinate produced is reported: the ladder blows up for
+nearly vertical planes, while disks stay inside the radius-25 ball.
+"""
+import sys
+
+import numpy as np
+
+from harness import measure, report
+from arrangement import Arrangement, EXTENT, RESOLUTION
+
+
+def legacy_surfaces(normals, resolution=RESOLUTION):
+    step = complex(0, resolution)
+    x_t, y_t = np.mgrid[-EXTENT:EXTENT:step, -EXTENT:EXTENT:step]
+    pts = np.empty((len(normals), resolution, resolution, 3))
+    for k, (nx, ny, nz) in enumerate(normals):
+        if nz == 0:
+            if ny == 0:
+                pts[k] = np.stack([np.zeros_like(y_t), x_t, y_t], axis=-1)
+            else:
+                pts[k] = np.stack([x_t, -(nx/ny)*x_t, y_t], axis=-1)
+        else:
+            pts[k] = np.stack([x_t, y_t, -(nx/nz)*x_t - (ny/nz)*y_t],
+                              axis=-1)
+    return pts
+
+
+def run():
+    rng = np.random.default_rng(0)
+    results = []
+    for count in (4, 32, 256):
+        normals = rng.normal(size=(count, 3))
+        # A few nearly vertical planes, as left by dragging norm_z to 0.
+        normals[::4, 2] = 1e-9
+        for name, fn in (('legacy', legacy_surfaces),
+                         ('bases', lambda n: Arrangement(n).surfaces()[0])):
+            extent = float(np.abs(fn(normals)).max())
+            timing = measure(lambda: fn(normals), repeat=5)
+            timing.update(name='surfaces_' + name,
+                          params={'n': count, 'max_coord': '%.3g' % extent})
+            results.append(timing)
+    return results
+
+
+def main(argv):
+    report(run(), argv[1] if len(argv) > 1 else None)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,39 @@
+"""Random arrangement generation, the general position test and batch
+statistics across worker processes."""
+import sys
+
+from harness import measure, report
+from random_arrangements import batch_statistics, general_position, generate
+
+
+def run():
+    results = []
+    for kind, count, dim in (('uniform', 300, 3), ('lattice', 300, 3),
+                             ('uniform', 60, 4)):
+        normals = generate(kind, 1, count, dim, rng=0, bound=5)[0]
+        params = {'kind': kind, 'n': count, 'd': dim,
+                  'generic': general_position(normals)}
+        timing = measure(lambda: general_position(normals), repeat=3)
+        timing.update(name='general_position', params=params)
+        results.append(timing)
+    batch = generate('uniform', 1000, 10, 3, rng=0)
+    timing = measure(lambda: general_position(batch), repeat=3)
+    timing.update(name='general_position_batch',
+                  params={'kind': 'uniform', 'batch': 1000, 'n': 10, 'd': 3})
+    results.append(timing)
+    for workers in (1, 4):
+        params = {'kind': 'uniform', 'arrangements': 1000, 'n': 10, 'd': 3,
+                  'workers': workers}
+        timing = measure(lambda: batch_statistics('uniform', 1000, 10, 3,
+                                                  workers), repeat=1)
+        timing.update(name='batch_statistics', params=params)
+        results.append(timing)
+    return results
+
+
+def main(argv):
+    report(run(), argv[1] if len(argv) > 1 else None)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
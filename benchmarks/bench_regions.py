@@ -0,0 +1,57 @@
+"""Scaling of region enumeration for random central arrangements, and of
+the bounded-region pass for deformations of reflection arrangements."""
+import sys
+
+import numpy as np
+
+from harness import measure, report
+from arrangement import Arrangement
+from combinatorics import bounded_count, regions, zaslavsky_count
+from root_systems import deformation
+
+
+def run():
+    rng = np.random.default_rng(0)
+    results = []
+    for dim in (3, 4):
+        for count in (10, 20, 30, 40):
+            normals = rng.normal(size=(count, dim))
+            found = len(regions(normals)[0])
+            expected = zaslavsky_count(normals)
+            if found != expected:
+                raise RuntimeError('d=%d, n=%d: %d regions, expected %d'
+                                   % (dim, count, found, expected))
+            params = {'d': dim, 'n': count, 'regions': found}
+            for name, fn in (('regions', regions),
+                             ('zaslavsky_count', zaslavsky_count)):
+                timing = measure(lambda: fn(normals), repeat=3)
+                timing.update(name=name, params=params)
+                results.append(timing)
+    for family, n, values in (('A', 3, (0, 1)), ('A', 3, (-1, 0, 1)),
+                              ('B', 3, (-1, 0, 1)), ('A', 4, (0, 1))):
+        arrangement = Arrangement(*deformation(family, n, values))
+        signs, _ = arrangement.regions()
+        found = int(arrangement.bounded(signs).sum())
+        expected = bounded_count(arrangement.normals, arrangement.offsets)
+        if found != expected:
+            raise RuntimeError('%s%d %r: %d bounded regions, expected %d'
+                               % (family, n, values, found, expected))
+        params = {'type': '%s%d' % (family, n), 'values': list(values),
+                  'n': len(arrangement), 'regions': len(signs),
+                  'bounded': found}
+        timing = measure(arrangement.regions, repeat=3)
+        timing.update(name='affine_regions', params=params)
+        results.append(timing)
+        if arrangement.dim == 3:
+            timing = measure(arrangement.bounded_mesh, repeat=3)
+            timing.update(name='bounded_mesh', params=params)
+            results.append(timing)
+    return results
+
+
+def main(argv):
+    report(run(), argv[1] if len(argv) > 1 else None)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
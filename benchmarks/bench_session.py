@@ -0,0 +1,63 @@
+"""Reopening a saved session against recomputing its geometry."""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from harness import measure, report
+from arrangement import Arrangement, EXTENT, RESOLUTION
+from combinatorics import IntersectionLattice
+from incremental import Layer, RowCache
+from session import GeometryCache, content_hash, load_session, save_session
+
+
+def draw(normals, rows):
+    # What Vis does on a redraw: fill the planes' buffer row by row.
+    arrangement = Arrangement(normals)
+    buffer = np.zeros((len(normals), RESOLUTION, RESOLUTION, 3))
+    Layer('surfaces', rows).update(arrangement, buffer, EXTENT, RESOLUTION)
+    return buffer
+
+
+def compute(normals):
+    cache, rows = GeometryCache(), RowCache()
+    draw(normals, rows)
+    chi = IntersectionLattice(normals).characteristic_polynomial()
+    cache.put(content_hash(normals, kind='chi'), {'chi': chi})
+    return cache, rows
+
+
+def reopen(path):
+    normals, _, entries, saved = load_session(path)
+    cache, rows = GeometryCache(), RowCache()
+    cache.update(entries)
+    for key, points, visible in saved:
+        rows.put(key, points, visible)
+    return draw(normals, rows)
+
+
+def run():
+    rng = np.random.default_rng(0)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (10, 50, 200):
+            normals = rng.normal(size=(count, 3))
+            path = os.path.join(tmp, 'session_%d.npz' % count)
+            save_session(path, normals, {'dim': '3'}, *compute(normals))
+            params = {'n': count,
+                      'MB': round(os.path.getsize(path)/2.**20, 1)}
+            for name, fn in (('recompute', lambda: compute(normals)),
+                             ('load', lambda: reopen(path))):
+                timing = measure(fn, repeat=3)
+                timing.update(name='session_' + name, params=params)
+                results.append(timing)
+    return results
+
+
+def main(argv):
+    report(run(), argv[1] if len(argv) > 1 else None)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
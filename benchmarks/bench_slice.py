@@ -0,0 +1,43 @@
+"""Cost of moving the 3-dimensional slice through a higher-rank arrangement.
+
+One update is what Vis does when slice_offset changes: restrict the
+hyperplanes to the moved slice and resample them into an existing buffer.
+"""
+import sys
+
+import numpy as np
+
+from harness import measure, report
+from arrangement import Arrangement, EXTENT, slice_basis
+from root_systems import reflecting_hyperplanes
+
+
+def run():
+    results = []
+    for family, n in (('D', 4), ('H', 4), ('E', 6), ('E', 8)):
+        arrangement = Arrangement(reflecting_hyperplanes(family, n))
+        basis, direction = slice_basis(arrangement.dim)
+        for resolution in (25, 100):
+            out = np.empty((len(arrangement), resolution, resolution, 3))
+            offsets = iter(np.linspace(-1., 1., 1000))
+
+            def update():
+                point = next(offsets)*EXTENT*direction
+                arrangement.slice(basis, point).surfaces(
+                    resolution=resolution, out=out)
+
+            timing = measure(update, repeat=5, number=10)
+            timing.update(name='slice_update',
+                          params={'type': '%s%d' % (family, n),
+                                  'planes': len(arrangement),
+                                  'res': resolution})
+            results.append(timing)
+    return results
+
+
+def main(argv):
+    report(run(), argv[1] if len(argv) > 1 else None)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,58 @@
+"""Time from opening the Vis window to its first rendered frame.
+
+Runs offscreen. `eager` builds every actor up front the way initalize_plot
+used to; `lazy` is the current behaviour, where actors are only created for
+what is visible.
+"""
+import os
+import sys
+import time
+
+from harness import measure, report
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+def first_frame(eager):
+    from pyface.api import GUI
+    from project_script_18B030023 import Vis, REFLECTION_GROUPS
+
+    gui = GUI()
+    vis = Vis()
+    ui = vis.edit_traits()
+    while vis.engine is None:
+        gui.process_events()
+    if eager:
+        for kind in ('sphere', 'circle', 'axes', 'lines', 'planes',
+                     'dihedral'):
+            vis._actor(kind)
+        for group in REFLECTION_GROUPS:
+            vis._actor('cells', group)
+    # The first flush draws the actors and renders them as it re-enables
+    # rendering; only a render from then on shows the first frame.
+    while vis.scheduler.flush_count == 0 or vis.render_count == 0:
+        gui.process_events()
+    ui.dispose()
+
+
+def run():
+    # Pay for the imports once so they do not count against either mode.
+    start = time.perf_counter()
+    import project_script_18B030023  # noqa: F401
+    print('import: %.3f s' % (time.perf_counter() - start))
+
+    results = []
+    for eager in (True, False):
+        timing = measure(lambda: first_frame(eager), repeat=3)
+        timing.update(name='first_frame',
+                      params={'mode': 'eager' if eager else 'lazy'})
+        results.append(timing)
+    return results
+
+
+def main(argv):
+    report(run(), argv[1] if len(argv) > 1 else None)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
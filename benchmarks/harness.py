@@ -0,0 +1,70 @@
+"""Minimal timing helpers shared by the benchmark scripts."""
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def measure(fn, repeat=5, number=1):
+    """Best and median wall time of `number` calls to fn, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start)/number)
+    return {'min': min(times), 'median': statistics.median(times),
+            'repeat': repeat, 'number': number}
+
+
+def report(results, path=None):
+    for result in results:
+        params = ', '.join('%s=%s' % item
+                           for item in sorted(result['params'].items()))
+        print('%-40s %-28s %10.3f ms' % (result['name'], params,
+                                         1e3*result['min']))
+    if path is not None:
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+def environment():
+    """Commit, versions and time the results were produced with."""
+    import platform
+    import subprocess
+
+    import numpy
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+    return {'commit': commit, 'python': platform.python_version(),
+            'numpy': numpy.__version__, 'machine': platform.machine(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def _key(result):
+    return result['name'], json.dumps(result['params'], sort_keys=True)
+
+
+def compare(old, new, threshold=1.2):
+    """Print results that got slower (or faster) by more than threshold."""
+    before = {_key(result): result['min'] for result in old}
+    for result in new:
+        previous = before.get(_key(result))
+        if not previous:
+            continue
+        ratio = result['min']/previous
+        if ratio > threshold or ratio < 1/threshold:
+            params = ', '.join('%s=%s' % item
+                               for item in sorted(result['params'].items()))
+            print('%-40s %-28s %6.2fx %s' % (
+                result['name'], params, ratio,
+                'slower' if ratio > 1 else 'faster'))
@@ -0,0 +1,57 @@
+"""Run every benchmark and store the results under results/<commit>.json.
+
+    python run_all.py [--only geometry,lattice] [--compare results/abc123.json]
+
+With --compare, timings that moved by more than 20% against the given
+file are listed after the run.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+
+from harness import ROOT, compare, environment, report
+
+SUITES = ('geometry', 'planes', 'observers', 'startup', 'regions',
+          'lattice', 'slice', 'session', 'random', 'backends')
+RESULTS = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--only', help='comma separated suites to run')
+    parser.add_argument('--compare', help='earlier results file')
+    parser.add_argument('--out', help='results file (default: '
+                                      'results/<commit>.json)')
+    args = parser.parse_args(argv[1:])
+
+    suites = args.only.split(',') if args.only else SUITES
+    env = environment()
+    results = []
+    for suite in suites:
+        print('== %s' % suite)
+        module = importlib.import_module('bench_' + suite)
+        try:
+            found = module.run()
+        except ImportError as error:
+            # The GUI suites need mayavi; skip them when it is missing.
+            print('skipped: %s' % error)
+            continue
+        for result in found:
+            result['suite'] = suite
+        report(found)
+        results.extend(found)
+
+    path = args.out or os.path.join(RESULTS, '%s.json' % env['commit'])
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'environment': env, 'results': results}, f, indent=2)
+    print('wrote %s' % path)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f)['results'], results)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
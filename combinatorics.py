@@ -0,0 +1,416 @@
+"""Combinatorics of central hyperplane arrangements.
+
+Regions are found by inserting the hyperplanes one at a time. When h is
+added, the regions it splits are exactly the regions of the restriction of
+the earlier hyperplanes to h (deletion-restriction), so an interior point
+of each new region comes from a recursive call one dimension down. No
+linear programs are needed: every region is carried around as one point
+in its interior.
+
+An affine arrangement n_i . x = b_i is handled through its cone: the
+central arrangement (n_i, -b_i) . (x, x0) = 0 together with x0 = 0, whose
+regions with x0 > 0 are the regions of the affine one.
+"""
+import itertools
+
+import numpy as np
+
+DECIMALS = 8
+TOL = 1e-9
+
+
+def distinct_hyperplanes(normals, decimals=DECIMALS):
+    """Unit normals of the distinct hyperplanes, in order of appearance."""
+    normals = np.asarray(normals, dtype=float)
+    if normals.ndim != 2:
+        raise ValueError('normals must be an (N, d) array')
+    if len(normals) == 0:
+        return normals.copy()
+    norms = np.linalg.norm(normals, axis=1)
+    if np.any(norms < TOL):
+        raise ValueError('a hyperplane needs a non-zero normal')
+    unit = normals/norms[:, None]
+    # n and -n describe the same hyperplane: make the first non-zero
+    # coordinate positive before comparing.
+    leading = np.argmax(np.abs(unit) > TOL, axis=1)
+    unit *= np.sign(unit[np.arange(len(unit)), leading])[:, None]
+    _, first = np.unique(np.round(unit, decimals) + 0., axis=0,
+                         return_index=True)
+    return unit[np.sort(first)]
+
+
+def cone(normals, offsets):
+    """The central arrangement in R^(d+1) over an affine one in R^d.
+
+    n . x = b becomes (n, -b) . (x, x0) = 0, and the hyperplane x0 = 0 is
+    appended last.
+    """
+    normals = np.asarray(normals, dtype=float)
+    coned = np.column_stack([normals, -np.asarray(offsets, dtype=float)])
+    return np.vstack([coned, np.eye(normals.shape[1] + 1)[-1]])
+
+
+def _is_affine(offsets):
+    return offsets is not None and np.any(offsets)
+
+
+def _complement(normal):
+    # Orthonormal basis (as columns) of the hyperplane orthogonal to normal.
+    q, _ = np.linalg.qr(np.column_stack([normal, np.eye(len(normal))]))
+    return q[:, 1:len(normal)]
+
+
+def _restrict(normals, k):
+    # The hyperplanes before k, restricted to hyperplane k, in coordinates
+    # on hyperplane k.
+    basis = _complement(normals[k])
+    return distinct_hyperplanes(normals[:k] @ basis), basis
+
+
+def _region_points(normals):
+    # One interior point per region, for distinct unit normals.
+    count, dim = normals.shape
+    if dim == 0:
+        return np.zeros((1, 0))
+    if dim == 1:
+        return np.array([[1.], [-1.]]) if count else np.zeros((1, 1))
+    if dim == 2:
+        if not count:
+            return np.zeros((1, 2))
+        # Lines through the origin: the regions are the 2m wedges between
+        # consecutive line directions.
+        angles = np.sort(np.mod(np.arctan2(normals[:, 1], normals[:, 0])
+                                + np.pi/2, np.pi))
+        bounds = np.concatenate([angles, angles + np.pi,
+                                 [angles[0] + 2*np.pi]])
+        middle = (bounds[:-1] + bounds[1:])/2
+        return np.column_stack([np.cos(middle), np.sin(middle)])
+
+    points = np.zeros((1, dim))
+    for k in range(count):
+        h, before = normals[k], normals[:k]
+        restricted, basis = _restrict(normals, k)
+        on_h = _region_points(restricted) @ basis.T
+        norms = np.linalg.norm(on_h, axis=1, keepdims=True)
+        on_h = np.divide(on_h, norms, out=on_h, where=norms > 0)
+
+        # Regions met by h are replaced by their two halves.
+        split = set(_sign_keys(on_h @ before.T))
+        keep = [key not in split for key in _sign_keys(points @ before.T)]
+
+        # Step off h by less than the distance to any earlier hyperplane,
+        # measured along h.
+        along = np.abs(before @ h)
+        dist = np.abs(on_h @ before.T)
+        ratio = np.divide(dist, along, out=np.full_like(dist, np.inf),
+                          where=along > TOL)
+        eps = np.minimum(ratio.min(axis=1, initial=np.inf), 1.)[:, None]/2
+        points = np.vstack([points[keep], on_h + eps*h, on_h - eps*h])
+    return points
+
+
+def _sign_keys(values):
+    # Interior points are never exactly on a hyperplane, so no tolerance:
+    # a thin region must not be mistaken for a face.
+    signs = np.ascontiguousarray(np.sign(values).astype(np.int8))
+    width = signs.shape[1]
+    if width == 0:
+        return [b''] * len(signs)
+    data = signs.tobytes()
+    return [data[i:i + width] for i in range(0, len(data), width)]
+
+
+def regions(normals, check=False, offsets=None):
+    """Enumerate the regions of the arrangement n_i . x = b_i.
+
+    Returns the (R, N) int8 sign vectors of n_i . x - b_i and an (R, d)
+    array holding one interior point per region. Without offsets the
+    arrangement is central. With check=True the count is compared
+    against Zaslavsky's theorem.
+    """
+    normals = np.asarray(normals, dtype=float)
+    if _is_affine(offsets):
+        signs, points = regions(cone(normals, offsets))
+        upper = signs[:, -1] > 0
+        signs = signs[upper, :-1]
+        points = points[upper, :-1]/points[upper, -1:]
+    else:
+        points = _region_points(distinct_hyperplanes(normals))
+        signs = np.sign(points @ normals.T).astype(np.int8)
+        if len(normals):
+            order = np.lexsort(signs.T[::-1])
+            signs, points = signs[order], points[order]
+    if check and len(signs) != zaslavsky_count(normals, offsets):
+        raise RuntimeError('found %d regions, Zaslavsky predicts %d'
+                           % (len(signs), zaslavsky_count(normals, offsets)))
+    return signs, points
+
+
+def _rays(normals):
+    # Both directions of every line where d - 1 of the hyperplanes meet.
+    unit = distinct_hyperplanes(normals)
+    dim = unit.shape[1]
+    if dim == 1:
+        return np.array([[1.], [-1.]])
+    combos = subsets(len(unit), dim - 1)
+    _, values, vt = np.linalg.svd(unit[combos])
+    lines = distinct_hyperplanes(vt[values[:, -1] > TOL, -1])
+    return np.vstack([lines, -lines])
+
+
+def bounded(normals, signs):
+    """Which of the regions with these sign vectors are bounded.
+
+    A region is unbounded exactly when it recedes along some line of the
+    central arrangement with the same normals, i.e. when the signs of
+    n_i . r for one of its rays r never disagree with the region's.
+    """
+    normals = np.asarray(normals, dtype=float)
+    signs = np.asarray(signs)
+    if not len(normals) or (np.linalg.matrix_rank(normals)
+                            < normals.shape[1]):
+        return np.zeros(len(signs), dtype=bool)
+    along = np.round(_rays(normals) @ normals.T, DECIMALS)
+    along = np.sign(along).astype(np.int8)
+    result = np.empty(len(signs), dtype=bool)
+    step = max(1, 2**22//along.size)
+    for start in range(0, len(signs), step):
+        block = signs[start:start + step]
+        recedes = np.all(block[:, None, :]*along[None] >= 0, axis=2)
+        result[start:start + step] = ~recedes.any(axis=1)
+    return result
+
+
+def subsets(count, k):
+    """Every k-subset of range(count), as the rows of a (C, k) array."""
+    if k == 0:
+        return np.zeros((1, 0), dtype=np.intp)
+    return np.fromiter(
+        itertools.chain.from_iterable(itertools.combinations(range(count),
+                                                             k)),
+        dtype=np.intp).reshape(-1, k)
+
+
+def discriminantal(vectors):
+    """Normals of the discriminantal arrangement B(n, k) of n vectors in R^k.
+
+    Moving the hyperplanes a_i . p = 0 to a_i . p = x_i, a set S of k + 1
+    of them is concurrent exactly on the hyperplane c_S . x_S = 0 of R^n,
+    c_S spanning the linear relations among the a_i in S. The normals are
+    returned in coordinates on the complement of the translations that
+    move all hyperplanes together (the column space of the a_i), R^(n-k).
+    The vectors should be generic.
+    """
+    vectors = np.asarray(vectors, dtype=float)
+    count, dim = vectors.shape
+    combos = subsets(count, dim + 1)
+    _, _, vt = np.linalg.svd(vectors[combos].transpose(0, 2, 1))
+    normals = np.zeros((len(combos), count))
+    np.put_along_axis(normals, combos, vt[:, -1], axis=1)
+    q, _ = np.linalg.qr(vectors, mode='complete')
+    return normals @ q[:, dim:]
+
+
+def vertices(normals, offsets):
+    """The points where d of the hyperplanes n_i . x = b_i meet in one point.
+
+    Every d-subset is solved in one batched call (in chunks); coincident
+    solutions are merged.
+    """
+    normals = np.asarray(normals, dtype=float)
+    offsets = np.asarray(offsets, dtype=float)
+    dim = normals.shape[1]
+    combos = subsets(len(normals), dim)
+    found = []
+    step = max(1, 2**20//dim**2)
+    for start in range(0, len(combos), step):
+        chunk = combos[start:start + step]
+        matrices = normals[chunk]
+        ok = np.abs(np.linalg.det(matrices)) > TOL
+        found.append(np.linalg.solve(matrices[ok],
+                                     offsets[chunk][ok][..., None])[..., 0])
+    points = np.vstack(found) if found else np.zeros((0, dim))
+    return np.unique(np.round(points, DECIMALS) + 0., axis=0)
+
+
+def walls(sign, region_signs):
+    """Indices of the hyperplanes bounding the region with this sign vector.
+
+    Hyperplane i is a wall exactly when flipping the i-th sign alone gives
+    another region; `region_signs` are all the regions, as from regions().
+    """
+    sign = np.asarray(sign, dtype=np.int8)
+    flipped = np.tile(sign, (len(sign), 1))
+    np.fill_diagonal(flipped, -sign)
+    known = set(_sign_keys(region_signs))
+    return [i for i, key in enumerate(_sign_keys(flipped)) if key in known]
+
+
+def _char_poly(normals):
+    # chi(A) = t^d - sum_k chi(A_{k-1} restricted to h_k), coefficients
+    # highest degree first.
+    count, dim = normals.shape
+    if dim <= 2 or count == 0:
+        chi = np.zeros(dim + 1, dtype=np.int64)
+        chi[0] = 1
+        if count and dim == 1:
+            chi[1] = -1
+        elif count and dim == 2:
+            chi[1:] = -count, count - 1
+        return chi
+    chi = np.zeros(dim + 1, dtype=np.int64)
+    chi[0] = 1
+    for k in range(count):
+        chi[1:] -= _char_poly(_restrict(normals, k)[0])
+    return chi
+
+
+def characteristic_polynomial(normals, offsets=None):
+    """Coefficients of chi_A(t), highest degree first (np.polyval order).
+
+    An affine arrangement's polynomial is that of its cone divided by
+    t - 1.
+    """
+    if _is_affine(offsets):
+        chi, _ = np.polydiv(characteristic_polynomial(cone(normals, offsets)),
+                            [1, -1])
+        return np.round(chi).astype(np.int64)
+    return _char_poly(distinct_hyperplanes(normals))
+
+
+def zaslavsky_count(normals, offsets=None):
+    """Number of regions, (-1)^d chi_A(-1), by Zaslavsky's theorem."""
+    chi = characteristic_polynomial(normals, offsets)
+    return int(abs(np.polyval(chi, -1)))
+
+
+def bounded_count(normals, offsets=None):
+    """Number of bounded regions, |chi_A(1)|, by Zaslavsky's theorem."""
+    chi = characteristic_polynomial(normals, offsets)
+    return int(abs(np.polyval(chi, 1)))
+
+
+def format_polynomial(coeffs, var='t'):
+    """Render coefficients (highest degree first) as e.g. 't^2 - 3t + 2'."""
+    degree = len(coeffs) - 1
+    terms = []
+    for i, c in enumerate(coeffs):
+        if c == 0:
+            continue
+        power = degree - i
+        body = '' if abs(c) == 1 and power else str(abs(c))
+        if power:
+            body += var if power == 1 else '%s^%d' % (var, power)
+        sign = '-' if c < 0 else '+'
+        terms.append((sign, body))
+    if not terms:
+        return '0'
+    text = ('-' if terms[0][0] == '-' else '') + terms[0][1]
+    return text + ''.join(' %s %s' % term for term in terms[1:])
+
+
+class IntersectionLattice(object):
+    """The poset of flats (intersections) of a central arrangement.
+
+    Flats are built bottom-up: each flat of rank r + 1 is the join of a
+    flat of rank r with one more hyperplane. A flat is identified by the
+    set of hyperplanes containing it, packed into bytes, which is the same
+    whichever way it was reached. Every flat keeps an orthonormal basis of
+    its normal space, so a join only extends that basis by one vector.
+    """
+
+    def __init__(self, normals, decimals=DECIMALS):
+        self.normals = distinct_hyperplanes(normals, decimals)
+        self.dim = self.normals.shape[1]
+        self.tol = 10.**-decimals
+        count = len(self.normals)
+        # members[i] is the boolean mask of hyperplanes containing flat i.
+        self.members = [np.zeros(count, dtype=bool)]
+        self.ranks = [0]
+        self._bases = [np.zeros((self.dim, 0))]
+        self._index = {self._key(self.members[0]): 0}
+        self._build()
+        self.mobius = self._mobius()
+
+    def __len__(self):
+        return len(self.members)
+
+    @staticmethod
+    def _key(mask):
+        return np.packbits(mask).tobytes()
+
+    def _joins(self, flat):
+        # All joins of `flat` with one more hyperplane, in one go: with B
+        # the basis of the flat and v the unit part of h orthogonal to it,
+        # n_i is in the join iff n_i - BB^T n_i is a multiple of v.
+        basis = self._bases[flat]
+        perp = self.normals - (self.normals @ basis) @ basis.T
+        candidates = np.nonzero(~self.members[flat])[0]
+        new = perp[candidates]
+        new /= np.linalg.norm(new, axis=1)[:, None]
+        residual = perp[None] - (new @ perp.T)[:, :, None]*new[:, None]
+        masks = np.einsum('hij,hij->hi', residual, residual) < self.tol**2
+        joins = []
+        for v, mask in zip(new, masks):
+            key = self._key(mask)
+            index = self._index.get(key)
+            if index is None:
+                index = self._index[key] = len(self.members)
+                self.members.append(mask)
+                self.ranks.append(self.ranks[flat] + 1)
+                self._bases.append(np.column_stack([basis, v]))
+                joins.append(index)
+        return joins
+
+    def _build(self):
+        top = np.linalg.matrix_rank(self.normals) if len(self.normals) else 0
+        # The atoms are the hyperplanes themselves.
+        layer = []
+        for i, normal in enumerate(self.normals):
+            mask = np.zeros(len(self.normals), dtype=bool)
+            mask[i] = True
+            self._index[self._key(mask)] = len(self.members)
+            layer.append(len(self.members))
+            self.members.append(mask)
+            self.ranks.append(1)
+            self._bases.append(normal[:, None])
+        for rank in range(1, top - 1):
+            layer = [index for flat in layer for index in self._joins(flat)]
+        if top > 1:
+            # Everything one step below the top joins up to the
+            # intersection of all the hyperplanes. At rank 1 that is the
+            # lone atom, already added.
+            self.members.append(np.ones(len(self.normals), dtype=bool))
+            self.ranks.append(top)
+
+    def _mobius(self):
+        members = np.array(self.members, dtype=np.float32)
+        ranks = np.array(self.ranks)
+        mobius = np.zeros(len(self), dtype=np.int64)
+        mobius[0] = 1
+        for rank in range(1, ranks.max(initial=0) + 1):
+            lower = np.nonzero(ranks < rank)[0]
+            below = members[lower]
+            # Y <= X exactly when no hyperplane through Y misses X. The
+            # flats of a rank are done in chunks to bound the memory used.
+            upper = np.nonzero(ranks == rank)[0]
+            step = max(1, 2**22//max(len(lower), 1))
+            for start in range(0, len(upper), step):
+                chunk = upper[start:start + step]
+                misses = below @ (1 - members[chunk]).T
+                mobius[chunk] = -(mobius[lower] @ (misses == 0))
+        return mobius
+
+    def flats(self, rank):
+        """Indices of the hyperplanes containing each flat of this rank."""
+        return [np.nonzero(m)[0] for m, r in zip(self.members, self.ranks)
+                if r == rank]
+
+    def rank(self):
+        return max(self.ranks)
+
+    def characteristic_polynomial(self):
+        """chi(t) = sum over flats X of mu(X) t^dim(X), highest first."""
+        chi = np.zeros(self.dim + 1, dtype=np.int64)
+        np.add.at(chi, self.ranks, self.mobius)
+        return chi
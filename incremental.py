@@ -0,0 +1,132 @@
+"""Per-hyperplane geometry, kept between redraws.
+
+A Layer mirrors the point buffer of one merged actor: row i holds the mesh
+(or line, or circle) of hyperplane i, and the layer remembers which
+hyperplane that is. Redrawing only touches the rows whose hyperplane
+changed. Those are copied from a RowCache, shared by all layers, when they
+were computed before; the rest are computed together in one Arrangement
+call. Editing one normal out of hundreds therefore costs one mesh.
+"""
+import collections
+
+import numpy as np
+
+from arrangement import Arrangement, EXTENT, RESOLUTION
+
+# The coordinates of the normal that each kind of geometry depends on.
+KIND_COMPONENTS = {'surfaces': 3, 'circles': 3, 'lines': 2}
+
+
+class RowCache(object):
+    """Least recently used store of single-hyperplane geometry.
+
+    Keys are (kind, extent, resolution, row bytes); entries are (points,
+    visible). At most `max_bytes` of points are kept.
+    """
+
+    def __init__(self, max_bytes=2**28):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, points, visible):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[0].nbytes
+        self.entries[key] = (points, visible)
+        self.nbytes += points.nbytes
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            _, (points, _) = self.entries.popitem(last=False)
+            self.nbytes -= points.nbytes
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+
+class Layer(object):
+    """The rows of one actor's point buffer and the hyperplane in each."""
+
+    def __init__(self, kind, cache=None):
+        if kind not in KIND_COMPONENTS:
+            raise ValueError('unknown kind of geometry %r, expected one of %s'
+                             % (kind, ', '.join(KIND_COMPONENTS)))
+        self.kind = kind
+        self.cache = RowCache() if cache is None else cache
+        self.rows = []
+        self.visible = np.zeros(0, dtype=bool)
+        self._target = None
+
+    def forget(self):
+        """Treat every row as stale, e.g. after the buffer was overwritten."""
+        self.rows = []
+        self._target = None
+
+    def _keys(self, arrangement, extent, resolution, shown):
+        rows = np.column_stack([
+            arrangement.normals[:, :KIND_COMPONENTS[self.kind]],
+            arrangement.offsets])
+        prefix = (self.kind, float(extent), resolution)
+        return [prefix + (row.tobytes(),) if show else None
+                for row, show in zip(rows, shown)]
+
+    def update(self, arrangement, buffer, extent=EXTENT,
+               resolution=RESOLUTION, shown=None):
+        """Write the geometry of `arrangement` into `buffer`, row by row.
+
+        Rows that are not `shown`, and hyperplanes missing the ball, are
+        collapsed to the origin. Returns the (N,) mask of rows drawn and
+        the indices of the rows rewritten; when there are none, the buffer
+        was not touched. A buffer other than last time's (the actor was
+        reallocated) is rewritten in full.
+        """
+        count = len(arrangement)
+        if shown is None:
+            shown = np.ones(count, dtype=bool)
+        # Views of the same actor's points share their base array; holding
+        # on to it keeps the identity test meaningful.
+        target = buffer if buffer.base is None else buffer.base
+        if target is not self._target or len(self.rows) != count:
+            self.rows = [False]*count
+            self.visible = np.zeros(count, dtype=bool)
+            self._target = target
+        keys = self._keys(arrangement, extent, resolution, shown)
+        stale = [i for i, (old, new) in enumerate(zip(self.rows, keys))
+                 if old != new]
+
+        # Hits are taken out before the misses go in, since putting those
+        # may evict them.
+        computed = {}
+        missing = []
+        for i in stale:
+            entry = None if keys[i] is None else self.cache.get(keys[i])
+            if entry is not None:
+                computed[i] = entry
+            elif keys[i] is not None:
+                missing.append(i)
+        if missing:
+            fresh = Arrangement(arrangement.normals[missing],
+                                arrangement.offsets[missing])
+            pts, visible = getattr(fresh, self.kind)(extent=extent,
+                                                     resolution=resolution)
+            for row, i in enumerate(missing):
+                computed[i] = (pts[row], bool(visible[row]))
+                self.cache.put(keys[i], *computed[i])
+        for i in stale:
+            points, visible = computed.get(i, (None, False))
+            if visible:
+                buffer[i] = points
+            else:
+                buffer[i] = 0.
+            self.visible[i] = visible
+        self.rows = keys
+        return self.visible.copy(), np.array(stale, dtype=np.intp)
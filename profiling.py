@@ -0,0 +1,88 @@
+"""Timing spans for Vis, summarised live and exported as a Chrome trace.
+
+Open a dumped trace in chrome://tracing or https://ui.perfetto.dev.
+"""
+import collections
+import contextlib
+import json
+import os
+import time
+
+
+class Profiler(object):
+    """Record named spans and rendered frames.
+
+    Each span is kept as a Chrome trace "complete" event, with a category
+    ('observer', 'draw', 'geometry', 'pipeline', 'render', ...) and any
+    JSON-able arguments. At most `max_events` spans are kept.
+    """
+
+    def __init__(self, max_events=100000, fps_window=2.):
+        self.events = collections.deque(maxlen=max_events)
+        self.stats = {}
+        self.frames = collections.deque()
+        self.fps_window = fps_window
+        self.last = None
+        self._origin = time.perf_counter()
+
+    def clear(self):
+        self.events.clear()
+        self.stats.clear()
+        self.frames.clear()
+        self.last = None
+
+    def record(self, name, category, start, end, **args):
+        duration = end - start
+        self.events.append({
+            'name': name, 'cat': category, 'ph': 'X',
+            'ts': 1e6*(start - self._origin), 'dur': 1e6*duration,
+            'pid': os.getpid(), 'tid': 0, 'args': args})
+        count, total, longest = self.stats.get(name, (0, 0., 0.))
+        self.stats[name] = (count + 1, total + duration,
+                            max(longest, duration))
+        if category == 'observer':
+            self.last = (name, duration)
+
+    @contextlib.contextmanager
+    def span(self, name, category='observer', **args):
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.record(name, category, start, time.perf_counter(), **args)
+
+    def frame(self, start, end):
+        """Record one render from start to end (perf_counter seconds)."""
+        self.record('render', 'render', start, end)
+        self.frames.append(end)
+        while self.frames and end - self.frames[0] > self.fps_window:
+            self.frames.popleft()
+
+    @property
+    def fps(self):
+        if len(self.frames) < 2:
+            return 0.
+        return (len(self.frames) - 1)/(self.frames[-1] - self.frames[0])
+
+    def top(self, count=3):
+        """(name, calls, total s, longest s) of the costliest spans."""
+        ranked = sorted(self.stats.items(), key=lambda item: -item[1][1])
+        return [(name,) + stat for name, stat in ranked[:count]]
+
+    def summary(self, count=3):
+        lines = ['FPS %.1f' % self.fps]
+        if self.last is not None:
+            lines.append('last event %s %.1f ms'
+                         % (self.last[0], 1e3*self.last[1]))
+        for name, calls, total, longest in self.top(count):
+            lines.append('%s: %d x, %.1f ms total, %.1f ms max'
+                         % (name, calls, 1e3*total, 1e3*longest))
+        return '\n'.join(lines)
+
+    def trace(self):
+        return {'traceEvents': list(self.events),
+                'displayTimeUnit': 'ms'}
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.trace(), f)
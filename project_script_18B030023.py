@@ -1,48 +1,163 @@
+import contextlib
+import functools
+import time
+
 import numpy as np
 
-from traits.api import HasTraits, Instance
-from traits.api import observe, Range, Bool, Enum, Float
+from pyface.api import GUI
+from pyface.timer.api import Timer, do_after
+from traits.api import HasTraits, Instance, List, Dict, Set
+from traits.api import observe, Range, Bool, Enum, Float, Int, Str
+from traits.api import Button, File
 from traitsui.api import Item, View, Group, VSplit
-from traitsui.api import CancelButton, HGroup, HSplit
-
-
-def sphere_data():
-    theta, phi = np.mgrid[0:np.pi:180j, 0:2*np.pi:360j]
-    r = 25
-    x, y = r*np.sin(theta)*np.cos(phi), r*np.sin(theta)*np.sin(phi)
-    z = r*np.cos(theta)*np.ones_like(phi)
-
-    return x, y, z
-
-
-def circle_data():
-    theta = np.linspace(0, 2*np.pi, 250)
-    r = 25
-    x = r*np.cos(theta)
-    y = r*np.sin(theta)
-    z = np.zeros_like(x)
-
-    return x, y, z
-
-
-def dihedral_data(no_of_lines):
-    n = 2*no_of_lines
-    r = 25
-    pts_angles = []
-    for i in range(n):
-        pts_angles.append(i/n*2*np.pi)
-    x_e = []
-    y_e = []
-    x_o = []
-    y_o = []
-    for i in range(n):
-        if i % 2 == 0:
-            x_e.append(r*np.cos(pts_angles[i]))
-            y_e.append(r*np.sin(pts_angles[i]))
-        else:
-            x_o.append(r*np.cos(pts_angles[i]))
-            y_o.append(r*np.sin(pts_angles[i]))
-    return x_e, y_e, x_o, y_o
+from traitsui.api import CancelButton, HSplit, TableEditor
+from traitsui.table_column import ObjectColumn
+from traitsui.extras.checkbox_column import CheckboxColumn
+
+from animation import keyframe_geometry, save_frames
+from arrangement import Arrangement, COORDINATE_NORMALS
+from arrangement import TYPE_A_NORMALS, TYPE_BD_NORMALS
+from arrangement import sphere_data, circle_data, dihedral_data
+from arrangement import dihedral_arrangement
+from arrangement import mesh_triangles, polyline_connections, slice_basis
+from arrangement import chamber_labels, unit_normals, spherical_patch
+from arrangement import EXTENT, RESOLUTION, SPHERE_RESOLUTION
+from combinatorics import format_polynomial, walls
+from combinatorics import characteristic_polynomial, discriminantal
+from root_systems import coxeter_polynomial, reflecting_hyperplanes
+from root_systems import deformation
+from root_systems import chamber_walls, chamber_word, format_word
+from root_systems import simple_roots
+from scheduler import UpdateScheduler
+from incremental import Layer, RowCache
+from profiling import Profiler
+from random_arrangements import KINDS, generate, general_position
+from reflection_group import ReflectionGroup
+from session import GeometryCache, content_hash, load_session, save_session
+
+# The reflection arrangements are drawn from groups of planes, so the
+# planes shared between types A, B and D only get one actor each.
+REFLECTION_GROUPS = {
+    'coordinate': COORDINATE_NORMALS,
+    'type_a': TYPE_A_NORMALS,
+    'type_bd': TYPE_BD_NORMALS,
+    'type_h3': reflecting_hyperplanes('H', 3),
+}
+ARRANGEMENT_GROUPS = {
+    'Coordinate Arrangement': ('coordinate',),
+    'Type A': ('type_a',),
+    'Type B': ('coordinate', 'type_a', 'type_bd'),
+    'Type D': ('type_a', 'type_bd'),
+    'Type H3': ('type_h3',),
+}
+# Simple roots of the group behind each arrangement type, for naming the
+# group element of a picked chamber.
+SIMPLE_ROOTS = {
+    'Coordinate Arrangement': np.eye(3),
+    'Type A': simple_roots('A', 2),
+    'Type B': simple_roots('B', 3),
+    'Type D': np.array([[1., -1., 0.], [0., 1., -1.], [0., 1., 1.]]),
+    'Type H3': simple_roots('H', 3),
+}
+# Reflection arrangements in R^4 and up, drawn as their intersection with
+# a 3-dimensional affine slice that is moved by slice_offset.
+SLICED_TYPES = {
+    'Type A4': ('A', 4), 'Type B4': ('B', 4), 'Type D4': ('D', 4),
+    'Type F4': ('F', 4), 'Type H4': ('H', 4), 'Type D5': ('D', 5),
+    'Type E6': ('E', 6), 'Type E7': ('E', 7), 'Type E8': ('E', 8),
+}
+# Affine deformations of reflection arrangements and discriminantal
+# arrangements, drawn with their bounded regions. The deformations are
+# scaled up by AFFINE_SCALE to fill the scene.
+AFFINE_TYPES = {
+    'Shi A3': lambda: deformation('A', 3, (0, 1)),
+    'Catalan A3': lambda: deformation('A', 3, (-1, 0, 1)),
+    'Linial A3': lambda: deformation('A', 3, (1,)),
+    'Shi B3': lambda: deformation('B', 3, (0, 1)),
+    'Discriminantal B(5,2)': lambda: (discriminantal(
+        np.random.default_rng(0).standard_normal((5, 2))), np.zeros(10)),
+    'Discriminantal B(6,3)': lambda: (discriminantal(
+        np.random.default_rng(0).standard_normal((6, 3))), np.zeros(15)),
+}
+AFFINE_SCALE = EXTENT/5
+
+# Level of detail used while the camera or a normal is being dragged, and
+# how long things must be still (ms) before the full detail comes back.
+COARSE_RESOLUTION = 25
+COARSE_SPHERE_RESOLUTION = 45
+REFINE_DELAY = 300
+# How long (ms) the hyperplanes must be left alone before the statistics
+# are recounted.
+STATISTICS_DELAY = 300
+
+# Traits written to a session file besides the hyperplanes themselves.
+SESSION_TRAITS = ('dim', 'ira', 'refl_arr_type', 'view_cox',
+                  'slice_offset', 'dihedral_arrangement_n', 'show_axes',
+                  'resolution', 'adaptive_detail')
+
+
+@functools.lru_cache(maxsize=None)
+def sliced_hyperplanes(name):
+    normals = reflecting_hyperplanes(*SLICED_TYPES[name])
+    normals.setflags(write=False)
+    return normals
+
+
+@functools.lru_cache(maxsize=None)
+def affine_arrangement(name):
+    normals, offsets = AFFINE_TYPES[name]()
+    return Arrangement(normals, AFFINE_SCALE*offsets)
+
+
+@functools.lru_cache(maxsize=None)
+def reflection_group(name):
+    return ReflectionGroup(SIMPLE_ROOTS[name])
+
+
+# The fundamental chamber as a patch just outside the sphere; the image
+# w(C) is drawn by multiplying its points by the matrix of w.
+@functools.lru_cache(maxsize=None)
+def fundamental_patch(name):
+    triangles = reflection_group(name).fundamental_triangles()
+    points, faces = spherical_patch(triangles, r=1.01*EXTENT)
+    points.setflags(write=False)
+    return points, faces
+
+
+def profiled(handler):
+    # Time an observer when Vis.profiling is on.
+    @functools.wraps(handler)
+    def wrapper(self, event=None):
+        if not self.profiling:
+            return handler(self, event)
+        with self.profiler.span(handler.__name__, 'observer',
+                                trait=getattr(event, 'name', None)):
+            return handler(self, event)
+    return wrapper
+
+
+class Hyperplane(HasTraits):
+    norm_x = Float(1.)
+    norm_y = Float(0.)
+    norm_z = Float(0.)
+    offset = Float(0.)
+    show = Bool(False)
+
+    @property
+    def normal(self):
+        return (self.norm_x, self.norm_y, self.norm_z)
+
+
+hyperplane_editor = TableEditor(
+    columns=[ObjectColumn(name='norm_x', label='x'),
+             ObjectColumn(name='norm_y', label='y'),
+             ObjectColumn(name='norm_z', label='z'),
+             ObjectColumn(name='offset', label='b'),
+             CheckboxColumn(name='show', label='Show')],
+    row_factory=Hyperplane,
+    deletable=True,
+    sortable=False,
+    auto_size=False)
 
 
 class Vis(HasTraits):
@@ -54,596 +169,941 @@ class Vis(HasTraits):
     plot = Instance(PipelineBase)
     engine = None
 
-    sphere, sphere_source = None, None
-    circle, circle_source = None, None
     dim = Enum('3', '2')
     ira = Bool(False)
     refl_arr_type = Enum('Coordinate Arrangement', 'Type A',
-                         'Type B', 'Type D')
+                         'Type B', 'Type D', 'Type H3', *SLICED_TYPES,
+                         *AFFINE_TYPES)
+    slice_offset = Range(-1., 1., 0.)
     view_cox = Bool(False)
-    plane_1_norm_x, plane_1_norm_y, plane_1_norm_z = (Float(0.),
-                                                      Float(1.),
-                                                      Float(1.))
-    plane_2_norm_x, plane_2_norm_y, plane_2_norm_z = (Float(-1.),
-                                                      Float(1.),
-                                                      Float(1.))
-    plane_3_norm_x, plane_3_norm_y, plane_3_norm_z = (Float(1.),
-                                                      Float(-1.),
-                                                      Float(1.))
-    plane_4_norm_x, plane_4_norm_y, plane_4_norm_z = (Float(1.),
-                                                      Float(1.),
-                                                      Float(1.))
-    line_1, line_2, line_3, line_4 = None, None, None, None
-    plane_1, show_plane_1 = None, Bool(False)
-    plane_2, show_plane_2 = None, Bool(False)
-    plane_3, show_plane_3 = None, Bool(False)
-    plane_4, show_plane_4 = None, Bool(False)
-    dihedral_arrangement_n = Range(2, 10)
+    hyperplanes = List(Instance(Hyperplane))
+    n_regions = Int(1)
+    n_bounded = Int(0)
+    generic = Bool(True)
+    random_kind = Enum(*KINDS)
+    random_count = Range(1, 500, 8)
+    randomize = Button('Random Arrangement')
+    char_poly = Str('t^3')
+    scheduler = Instance(UpdateScheduler)
+    dihedral_arrangement_n = Range(2, 5000)
     show_axes = Bool(True)
-    dihedral_points_e = None
-    dihedral_points_o = None
-
-    x_axis, y_axis, z_axis = None, None, None
-    scp_coord_b_1, scp_coord_b_2, scp_coord_b_3 = None, None, None
-    coord_b_1, coord_b_2, coord_b_3 = None, None, None
-    scp_abd_1, scp_abd_2, scp_abd_3 = None, None, None
-    abd_1, abd_2, abd_3 = None, None, None
-    scp_bd_1, scp_bd_2, scp_bd_3 = None, None, None
-    bd_1, bd_2, bd_3 = None, None, None
+    show_circles = Bool(False)
+    resolution = Range(10, 200, RESOLUTION)
+    adaptive_detail = Bool(True)
+    interacting = Bool(False)
+    _last_interaction = 0.
+    _last_edit = 0.
+    session_file = File('session.npz')
+    save = Button('Save Session')
+    load = Button('Load Session')
+    geometry_cache = Instance(GeometryCache, ())
+    row_cache = Instance(RowCache, ())
+    set_keyframe = Button('Set Keyframe')
+    animate = Button('Animate')
+    export_animation = Button('Export GIF')
+    animation_frames = Range(2, 240, 60)
+    frame_interval = Range(10, 1000, 33)
+    animation_file = File('animation.gif')
+    explore = Bool(False)
+    element = Range(low=0, high='last_element')
+    last_element = Int(0)
+    element_info = Str('')
+    picking = Bool(False)
+    pick_info = Str('')
+    profiling = Bool(False)
+    profiler = Instance(Profiler, ())
+    trace_file = File('trace.json')
+    dump_trace = Button('Dump Trace')
+    # Actors used by the current flush, counted while profiling.
+    _touched = Set()
+    _render_start = 0.
+    _renders = 0
+    _overlay_render = False
+    _overlay_timer = None
+    _keyframe = None
+    _animation = None
+    _frame = 0
+    _bounded_key = None
+    _chamber_key = None
+    # Actors are only built the first time something needs to show them
+    # (see _actor), so startup pays for the visible objects alone.
+    actors = Dict()
+    # The Layer behind each merged actor, which knows the hyperplane drawn
+    # in every row of its points (see _fill).
+    layers = Dict()
 
     @observe('scene.activated')
+    @profiled
     def initalize_plot(self, event=None):
         if self.engine is None:
             engine = self.scene.mlab.get_engine()
             self.engine = engine
-            x, y, z = sphere_data()
-            self.sphere = self.scene.mlab.mesh(x, y, z)
-            x, y, z = circle_data()
-            self.circle = self.scene.mlab.plot3d(x, y, z)
-            self.sphere_source = self.sphere.parent.parent.parent
-            self.circle_source = self.circle.parent.parent.parent
-            self.circle.parent.parent.filter.radius = 0.5
-            self.sphere.visible = False
-            self.circle.visible = False
-            # Creation of axes
-            t_axis = np.linspace(-30, 30, 100)
-            x_axis_x, x_axis_y, x_axis_z = (t_axis,
-                                            np.zeros_like(t_axis),
-                                            np.zeros_like(t_axis))
-            self.x_axis = self.scene.mlab.plot3d(x_axis_x, x_axis_y, x_axis_z)
-            y_axis_y, y_axis_x, y_axis_z = (t_axis,
-                                            np.zeros_like(t_axis),
-                                            np.zeros_like(t_axis))
-            self.y_axis = self.scene.mlab.plot3d(y_axis_x, y_axis_y, y_axis_z)
-            z_axis_z, z_axis_y, z_axis_x = (t_axis,
-                                            np.zeros_like(t_axis),
-                                            np.zeros_like(t_axis))
-            self.z_axis = self.scene.mlab.plot3d(z_axis_x, z_axis_y, z_axis_z)
-
-            self.x_axis.parent.parent.filter.radius = 0.5
-            self.y_axis.parent.parent.filter.radius = 0.5
-            self.z_axis.parent.parent.filter.radius = 0.5
-
-            # Creation of Lines
-            x = np.linspace(-25, 25, 100)
-            y1 = (-(self.plane_1_norm_x/self.plane_1_norm_y))*x
-            y2 = (-(self.plane_2_norm_x/self.plane_2_norm_y))*x
-            y3 = (-(self.plane_3_norm_x/self.plane_3_norm_y))*x
-            y4 = (-(self.plane_4_norm_x/self.plane_4_norm_y))*x
-            z = np.zeros_like(x)
-
-            self.line_1 = self.scene.mlab.plot3d(x, y1, z, color=(1, 0, 0))
-            self.line_2 = self.scene.mlab.plot3d(x, y2, z, color=(1, 0, 0))
-            self.line_3 = self.scene.mlab.plot3d(x, y3, z, color=(1, 0, 0))
-            self.line_4 = self.scene.mlab.plot3d(x, y4, z, color=(1, 0, 0))
-
-            self.line_1.parent.parent.filter.radius = 0.7
-            self.line_2.parent.parent.filter.radius = 0.7
-            self.line_3.parent.parent.filter.radius = 0.7
-            self.line_4.parent.parent.filter.radius = 0.7
-
-            self.line_1.visible = False
-            self.line_2.visible = False
-            self.line_3.visible = False
-            self.line_4.visible = False
-            # Creation of Planes
-            x, y = np.mgrid[-25:25:100j, -25:25:100j]
-            z1 = ((-(self.plane_1_norm_x/self.plane_1_norm_z))*x
-                  + (-(self.plane_1_norm_y/self.plane_1_norm_z))*y)
-            z2 = ((-(self.plane_2_norm_x/self.plane_2_norm_z))*x
-                  + (-(self.plane_2_norm_y/self.plane_2_norm_z))*y)
-            z3 = ((-(self.plane_3_norm_x/self.plane_3_norm_z))*x
-                  + (-(self.plane_3_norm_y/self.plane_3_norm_z))*y)
-            z4 = ((-(self.plane_4_norm_x/self.plane_4_norm_z))*x
-                  + (-(self.plane_4_norm_y/self.plane_4_norm_z))*y)
-            x_co_b1 = np.zeros_like(x)
-            x_co_b2 = x
-            x_co_b3 = x
-            y_co_b1 = x
-            y_co_b2 = np.zeros_like(y)
-            y_co_b3 = y
-            z_co_b1 = y
-            z_co_b2 = y
-            z_co_b3 = np.zeros_like(x)
-
-            x_abd_1 = x
-            x_abd_2 = x
-            x_abd_3 = x
-            y_abd_1 = y
-            y_abd_2 = y
-            y_abd_3 = x
-            z_abd_1 = y
-            z_abd_2 = x
-            z_abd_3 = y
-
-            x_bd_1 = x
-            x_bd_2 = x
-            x_bd_3 = x
-            y_bd_1 = -x
-            y_bd_2 = y
-            y_bd_3 = y
-            z_bd_1 = y
-            z_bd_2 = -y
-            z_bd_3 = -x
-
-            self.coord_b_1 = self.scene.mlab.mesh(x_co_b1,
-                                                  y_co_b1,
-                                                  z_co_b1)
-            self.coord_b_2 = self.scene.mlab.mesh(x_co_b2,
-                                                  y_co_b2,
-                                                  z_co_b2)
-            self.coord_b_3 = self.scene.mlab.mesh(x_co_b3,
-                                                  y_co_b3,
-                                                  z_co_b3)
-            self.abd_1 = self.scene.mlab.mesh(x_abd_1,
-                                              y_abd_1,
-                                              z_abd_1)
-            self.abd_2 = self.scene.mlab.mesh(x_abd_2,
-                                              y_abd_2,
-                                              z_abd_2)
-            self.abd_3 = self.scene.mlab.mesh(x_abd_3,
-                                              y_abd_3,
-                                              z_abd_3)
-            self.bd_1 = self.scene.mlab.mesh(x_bd_1,
-                                             y_bd_1,
-                                             z_bd_1)
-            self.bd_2 = self.scene.mlab.mesh(x_bd_2,
-                                             y_bd_2,
-                                             z_bd_2)
-            self.bd_3 = self.scene.mlab.mesh(x_bd_3,
-                                             y_bd_3,
-                                             z_bd_3)
-
-            self.coord_b_1.visible = False
-            self.coord_b_2.visible = False
-            self.coord_b_3.visible = False
-            self.abd_1.visible = False
-            self.abd_2.visible = False
-            self.abd_3.visible = False
-            self.bd_1.visible = False
-            self.bd_2.visible = False
-            self.bd_3.visible = False
-
-            self.plane_1 = self.scene.mlab.mesh(x, y, z1)
-            self.plane_2 = self.scene.mlab.mesh(x, y, z2)
-            self.plane_3 = self.scene.mlab.mesh(x, y, z3)
-            self.plane_4 = self.scene.mlab.mesh(x, y, z4)
-
-            self.plane_1.visible = False
-            self.plane_2.visible = False
-            self.plane_3.visible = False
-            self.plane_4.visible = False
-
-            # Creation of SCPs
-            p1 = self.scene.mlab.pipeline.scalar_cut_plane(self.sphere_source)
-            self.scp_coord_b_1 = p1
-            p2 = self.scene.mlab.pipeline.scalar_cut_plane(self.sphere_source)
-            self.scp_coord_b_2 = p2
-            p3 = self.scene.mlab.pipeline.scalar_cut_plane(self.sphere_source)
-            self.scp_coord_b_3 = p3
-            p4 = self.scene.mlab.pipeline.scalar_cut_plane(self.sphere_source)
-            self.scp_abd_1 = p4
-            p5 = self.scene.mlab.pipeline.scalar_cut_plane(self.sphere_source)
-            self.scp_abd_2 = p5
-            p6 = self.scene.mlab.pipeline.scalar_cut_plane(self.sphere_source)
-            self.scp_abd_3 = p6
-            p7 = self.scene.mlab.pipeline.scalar_cut_plane(self.sphere_source)
-            self.scp_bd_1 = p7
-            p8 = self.scene.mlab.pipeline.scalar_cut_plane(self.sphere_source)
-            self.scp_bd_2 = p8
-            p9 = self.scene.mlab.pipeline.scalar_cut_plane(self.sphere_source)
-            self.scp_bd_3 = p9
-
-            self.scp_coord_b_1.visible = False
-            self.scp_coord_b_2.visible = False
-            self.scp_coord_b_3.visible = False
-            self.scp_abd_1.visible = False
-            self.scp_abd_2.visible = False
-            self.scp_abd_3.visible = False
-            self.scp_bd_1.visible = False
-            self.scp_bd_2.visible = False
-            self.scp_bd_3.visible = False
-
-            origin = np.array([0., 0., 0.])
-            self.scp_coord_b_1.implicit_plane.widget.origin = origin
-            origin = np.array([0., 0.1, 0.])
-            self.scp_coord_b_2.implicit_plane.widget.origin = origin
-            origin = np.array([0., 0., 0.])
-            self.scp_coord_b_3.implicit_plane.widget.origin = origin
-            origin = np.array([0., 0., 0.])
-            self.scp_abd_1.implicit_plane.widget.origin = origin
-            origin = np.array([0., 0., 0.])
-            self.scp_abd_2.implicit_plane.widget.origin = origin
-            origin = np.array([0., 0., 0.])
-            self.scp_abd_3.implicit_plane.widget.origin = origin
-            origin = np.array([0., 0., 0.])
-            self.scp_bd_1.implicit_plane.widget.origin = origin
-            origin = np.array([0., 0., 0.])
-            self.scp_bd_2.implicit_plane.widget.origin = origin
-            origin = np.array([0., 0., 0.])
-            self.scp_bd_3.implicit_plane.widget.origin = origin
-
-            normal = np.array([1., 0., 0.])
-            self.scp_coord_b_1.implicit_plane.widget.normal = normal
-            normal = np.array([0., 1., 0.])
-            self.scp_coord_b_2.implicit_plane.widget.normal = normal
-            normal = np.array([0., 0., 1.])
-            self.scp_coord_b_3.implicit_plane.widget.normal = normal
-            normal = np.array([1., -1., 0.])
-            self.scp_abd_1.implicit_plane.widget.normal = normal
-            normal = np.array([0., 1., -1.])
-            self.scp_abd_2.implicit_plane.widget.normal = normal
-            normal = np.array([-1., 0., 1.])
-            self.scp_abd_3.implicit_plane.widget.normal = normal
-            normal = np.array([1., 1., 0.])
-            self.scp_bd_1.implicit_plane.widget.normal = normal
-            normal = np.array([0., 1., 1.])
-            self.scp_bd_2.implicit_plane.widget.normal = normal
-            normal = np.array([1., 0., 1.])
-            self.scp_bd_3.implicit_plane.widget.normal = normal
-
-            self.scp_coord_b_1.implicit_plane.widget.enabled = False
-            self.scp_coord_b_2.implicit_plane.widget.enabled = False
-            self.scp_coord_b_3.implicit_plane.widget.enabled = False
-            self.scp_abd_1.implicit_plane.widget.enabled = False
-            self.scp_abd_2.implicit_plane.widget.enabled = False
-            self.scp_abd_3.implicit_plane.widget.enabled = False
-            self.scp_bd_1.implicit_plane.widget.enabled = False
-            self.scp_bd_2.implicit_plane.widget.enabled = False
-            self.scp_bd_3.implicit_plane.widget.enabled = False
+            interactor = self.scene.interactor
+            interactor.add_observer('StartInteractionEvent',
+                                    self._start_interaction)
+            interactor.add_observer('EndInteractionEvent',
+                                    self._end_interaction)
+            interactor.add_observer('MouseMoveEvent', self._hover)
+            renderer = self.scene.renderer
+            renderer.add_observer('StartEvent', self._render_started)
+            renderer.add_observer('EndEvent', self._render_finished)
+            self.scheduler.mark('axes', 'planes', 'chambers', 'cells',
+                                'circles', 'slice', 'affine', 'element',
+                                'dihedral')
+            if self.profiling:
+                self._show_overlay()
 
-            x_e, y_e, x_o, y_o = dihedral_data(self.dihedral_arrangement_n)
-            z = np.zeros_like(x_e)
-            self.dihedral_points_e = self.scene.mlab.points3d(x_e, y_e, z,
-                                                              color=(1, 0, 0),
-                                                              scale_factor=3.)
-            self.dihedral_points_o = self.scene.mlab.points3d(x_o, y_o, z,
-                                                              color=(0, 0, 1),
-                                                              scale_factor=3.)
-
-            self.dihedral_points_e.visible = False
-            self.dihedral_points_o.visible = False
+    def _start_interaction(self, obj=None, event=None):
+        self.interacting = True
+
+    def _end_interaction(self, obj=None, event=None):
+        self._last_interaction = time.perf_counter()
+        do_after(REFINE_DELAY, self._refine)
+
+    def _refine(self):
+        idle = time.perf_counter() - self._last_interaction
+        if idle >= REFINE_DELAY/1000.:
+            self.interacting = False
+
+    def _detail(self):
+        if self.adaptive_detail and self.interacting:
+            return COARSE_RESOLUTION, COARSE_SPHERE_RESOLUTION
+        return self.resolution, SPHERE_RESOLUTION
+
+    def _actor(self, kind, *args):
+        key = (kind,) + args
+        if self.profiling:
+            self._touched.add(key)
+        if key not in self.actors:
+            self.actors[key] = getattr(self, '_make_' + kind)(*args)
+        return self.actors[key]
+
+    def _set_visible(self, kind, *args, visible=True):
+        if not visible and (kind,) + args not in self.actors:
+            return
+        actor = self._actor(kind, *args)
+        for part in (actor if isinstance(actor, tuple) else (actor,)):
+            part.visible = visible
+
+    def _make_sphere(self):
+        x, y, z = sphere_data(resolution=self._detail()[1])
+        sphere = self.scene.mlab.mesh(x, y, z, scalars=np.zeros_like(x),
+                                      colormap='hsv')
+        sphere.visible = False
+        return sphere
+
+    def _make_circle(self):
+        x, y, z = circle_data()
+        circle = self.scene.mlab.plot3d(x, y, z)
+        circle.parent.parent.filter.radius = 0.5
+        return circle
+
+    def _make_axes(self):
+        t_axis = np.linspace(-30, 30, 100)
+        zeros = np.zeros_like(t_axis)
+        axes = (self.scene.mlab.plot3d(t_axis, zeros, zeros),
+                self.scene.mlab.plot3d(zeros, t_axis, zeros),
+                self.scene.mlab.plot3d(zeros, zeros, t_axis))
+        for axis in axes:
+            axis.parent.parent.filter.radius = 0.5
+        return axes
+
+    def _make_lines(self):
+        lines, _ = self._arrangement().lines(resolution=self._detail()[0])
+        return self._polylines(lines, color=(1, 0, 0), radius=0.7)
+
+    def _make_circles(self):
+        pts, _ = self._circle_arrangement().circles(
+            resolution=self._detail()[1] + 1)
+        return self._polylines(pts, color=(0, 0, 0), radius=0.25)
+
+    def _make_planes(self):
+        pts, _ = self._arrangement().surfaces(resolution=self._detail()[0])
+        return self._merged_mesh(pts)
+
+    def _make_cells(self, group):
+        pts, _ = Arrangement(REFLECTION_GROUPS[group]).surfaces()
+        return self._merged_mesh(pts)
+
+    def _make_slice(self):
+        pts, _ = self._sliced_arrangement().surfaces(
+            resolution=self._detail()[0])
+        return self._merged_mesh(pts, color=(0.2, 0.4, 0.9))
+
+    def _make_affine(self):
+        pts, _ = affine_arrangement(self.refl_arr_type).surfaces(
+            resolution=self._detail()[0])
+        return self._merged_mesh(pts, color=(0.6, 0.6, 0.6), opacity=0.25)
+
+    def _make_bounded(self):
+        points, triangles, labels = self._bounded_mesh()
+        self._bounded_key = self.refl_arr_type
+        return self.scene.mlab.triangular_mesh(
+            points[:, 0], points[:, 1], points[:, 2], triangles,
+            scalars=labels, colormap='hsv')
+
+    def _make_element(self):
+        points, faces = fundamental_patch(self.refl_arr_type)
+        return self.scene.mlab.triangular_mesh(
+            points[:, 0], points[:, 1], points[:, 2], faces,
+            color=(1., 0.85, 0.))
+
+    def _make_dihedral(self):
+        x_e, y_e, x_o, y_o = dihedral_data(self.dihedral_arrangement_n)
+        z = np.zeros_like(x_e)
+        return (self.scene.mlab.points3d(x_e, y_e, z, color=(1, 0, 0),
+                                         scale_factor=3.),
+                self.scene.mlab.points3d(x_o, y_o, z, color=(0, 0, 1),
+                                         scale_factor=3.))
+
+    def _hyperplanes_default(self):
+        return [Hyperplane(norm_x=0., norm_y=1., norm_z=1.),
+                Hyperplane(norm_x=-1., norm_y=1., norm_z=1.),
+                Hyperplane(norm_x=1., norm_y=-1., norm_z=1.),
+                Hyperplane(norm_x=1., norm_y=1., norm_z=1.)]
+
+    def _slice(self):
+        normals = sliced_hyperplanes(self.refl_arr_type)
+        basis, direction = slice_basis(normals.shape[1])
+        return normals, basis, self.slice_offset*EXTENT*direction
+
+    def _sliced_arrangement(self):
+        normals, basis, point = self._slice()
+        return Arrangement(normals).slice(basis, point)
+
+    def _arrangement(self):
+        normals = [plane.normal for plane in self.hyperplanes]
+        return Arrangement(np.reshape(normals, (-1, 3)),
+                           [plane.offset for plane in self.hyperplanes])
+
+    # Central arrangements are keyed by their normals alone, as before
+    # offsets existed, so older session caches still match.
+    def _key(self, arrangement, **params):
+        data = arrangement.normals
+        if np.any(arrangement.offsets):
+            data = np.column_stack([data, arrangement.offsets])
+        return content_hash(data, **params)
+
+    # All hyperplanes share one actor: the meshes (or polylines) are
+    # concatenated into a single polydata, so the number of VTK pipelines
+    # does not grow with the number of hyperplanes.
+    def _merged_mesh(self, pts, **kwargs):
+        count, rows, cols, _ = pts.shape
+        flat = pts.reshape(-1, 3)
+        return self.scene.mlab.triangular_mesh(
+            flat[:, 0], flat[:, 1], flat[:, 2],
+            mesh_triangles(count, rows, cols), **kwargs)
+
+    def _polylines(self, pts, color, radius):
+        flat = pts.reshape(-1, 3)
+        src = self.scene.mlab.pipeline.scalar_scatter(flat[:, 0], flat[:, 1],
+                                                      flat[:, 2])
+        src.mlab_source.dataset.lines = polyline_connections(*pts.shape[:2])
+        src.update()
+        tube = self.scene.mlab.pipeline.tube(src, tube_radius=radius)
+        return self.scene.mlab.pipeline.surface(tube, color=color)
+
+    # The mlab sources keep their points in an (M, 3) array that the VTK
+    # dataset shares, so geometry is written straight into it and the
+    # pipeline is told once through mlab_source.update(). Only a change in
+    # the number of hyperplanes (or the resolution) reallocates.
+    def _mesh_buffer(self, actor, shape):
+        source = actor.mlab_source
+        count, rows, cols, _ = shape
+        if source.points.size != np.prod(shape):
+            zeros = np.zeros(count*rows*cols)
+            source.reset(x=zeros, y=zeros, z=zeros,
+                         triangles=mesh_triangles(count, rows, cols))
+        buffer = source.points.view()
+        buffer.shape = shape
+        return buffer
+
+    def _polyline_buffer(self, actor, shape):
+        source = actor.mlab_source
+        if source.points.size != np.prod(shape):
+            zeros = np.zeros(shape[0]*shape[1])
+            source.reset(x=zeros, y=zeros, z=zeros)
+            source.dataset.lines = polyline_connections(*shape[:2])
+        buffer = source.points.view()
+        buffer.shape = shape
+        return buffer
+
+    # Each merged actor is redrawn row by row: only the hyperplanes whose
+    # normal, offset or visibility changed are recomputed (or copied from
+    # the row cache), and an actor with no changed row is not updated.
+    def _fill(self, name, actor, arrangement, kind, res, shown=None,
+              extent=EXTENT):
+        if kind == 'surfaces':
+            buffer = self._mesh_buffer(actor, (len(arrangement), res, res, 3))
         else:
-            pass
+            buffer = self._polyline_buffer(actor, (len(arrangement), res, 3))
+        if name not in self.layers:
+            self.layers[name] = Layer(kind, self.row_cache)
+        with self._span(kind, 'geometry', n=len(arrangement), res=res,
+                        layer=name) as args:
+            visible, changed = self.layers[name].update(
+                arrangement, buffer, extent, res, shown)
+            args['changed'] = len(changed)
+        if len(changed):
+            self._update_source(actor)
+        return visible
+
+    # Observers only record what went stale; the scheduler then redraws
+    # everything in one batch with rendering disabled, so a user action
+    # costs a single render however many handlers it fires.
+    def _scheduler_default(self):
+        return UpdateScheduler(self._apply, GUI.invoke_later)
+
+    @property
+    def render_count(self):
+        """Renders of the scene so far, from whatever caused them."""
+        return self._renders
+
+    def _apply(self, dirty):
+        if 'statistics' in dirty:
+            # Needs no scene, so it is not held back until there is one.
+            with self._span('_count_statistics', 'geometry'):
+                self._count_statistics()
+        if self.engine is None:
+            return
+        self._touched = set()
+        with self._span('flush', 'scheduler', flags=sorted(dirty)) as args:
+            self.scene.disable_render = True
+            try:
+                for flag in ('axes', 'planes', 'chambers', 'cells',
+                             'circles', 'slice', 'affine', 'element',
+                             'dihedral'):
+                    if flag in dirty:
+                        with self._span('_draw_' + flag, 'draw'):
+                            getattr(self, '_draw_' + flag)()
+            finally:
+                self.scene.disable_render = False
+            args['actors'] = len(self._touched)
+
+    # Profiling: observers (see profiled), draws, geometry, pipeline
+    # updates and renders are timed into self.profiler while profiling is
+    # on, and a text overlay shows the summary twice a second.
+    def _span(self, name, category, **args):
+        if self.profiling:
+            return self.profiler.span(name, category, **args)
+        return contextlib.nullcontext(args)
+
+    def _update_source(self, actor):
+        with self._span('mlab_source.update', 'pipeline'):
+            actor.mlab_source.update()
+
+    def _render_started(self, obj=None, event=None):
+        self._renders += 1
+        self._render_start = time.perf_counter()
+
+    def _render_finished(self, obj=None, event=None):
+        # Redrawing the overlay's own text is not a frame of the scene.
+        if self.profiling and not self._overlay_render:
+            self.profiler.frame(self._render_start, time.perf_counter())
+
+    def _make_overlay(self):
+        overlay = self.scene.mlab.text(0.01, 0.01, ' ', width=0.3)
+        overlay.actor.text_scale_mode = 'none'
+        overlay.property.font_size = 12
+        overlay.property.color = (1., 1., 1.)
+        return overlay
+
+    def _update_overlay(self):
+        # The text is set with rendering held off; turning it back on
+        # renders once, right here, so that render is known to be the
+        # overlay's and kept out of the FPS window and the render spans.
+        self._overlay_render = True
+        self.scene.disable_render = True
+        try:
+            self._actor('overlay').text = self.profiler.summary()
+        finally:
+            self.scene.disable_render = False
+            self._overlay_render = False
+
+    def _show_overlay(self):
+        self._set_visible('overlay')
+        if self._overlay_timer is None:
+            self._overlay_timer = Timer(500, self._update_overlay)
+
+    @observe('profiling')
+    def toggle_profiling(self, event=None):
+        if self.profiling:
+            self.profiler.clear()
+            # Without a scene yet, initalize_plot shows the overlay.
+            if self.engine is not None:
+                self._show_overlay()
+            return
+        if self._overlay_timer is not None:
+            self._overlay_timer.Stop()
+            self._overlay_timer = None
+        self._set_visible('overlay', visible=False)
+
+    @observe('dump_trace')
+    def write_trace(self, event=None):
+        self.profiler.dump(self.trace_file)
 
     @observe('show_axes,dim')
+    @profiled
     def view_axes(self, event=None):
-        if self.show_axes and self.dim == '3':
-            self.x_axis.visible = True
-            self.y_axis.visible = True
-            self.z_axis.visible = True
-        elif self.show_axes and self.dim == '2':
-            self.x_axis.visible = True
-            self.y_axis.visible = True
-            self.z_axis.visible = False
-        else:
-            self.x_axis.visible = False
-            self.y_axis.visible = False
-            self.z_axis.visible = False
-
-    @observe('show_plane_1,plane_1_norm_x,plane_1_norm_y,plane_1_norm_z,dim')
-    def edit_plane_1(self, event=None):
-        x_t, y_t = np.mgrid[-25:25:100j, -25:25:100j]
-        t = np.linspace(-25, 25, 100)
-        if self.show_plane_1 and self.dim == '3':
-            self.line_1.visible = False
-            self.plane_1.visible = True
-            if self.plane_1_norm_z == 0:
-                if self.plane_1_norm_y == 0:
-                    if self.plane_1_norm_x == 0:
-                        self.plane_1.visible = False
-                    else:
-                        self.plane_1.mlab_source.set(x=np.zeros_like(y_t),
-                                                     y=x_t, z=y_t)
-                    # self.scene.mlab.process_ui_elements()
-                else:
-                    y_new = (-(self.plane_1_norm_x/self.plane_1_norm_y))*x_t
-                    self.plane_1.mlab_source.set(x=x_t, y=y_new, z=y_t)
-                    # self.scene.mlab.process_ui_elements()
-            else:
-                z_new = ((-(self.plane_1_norm_x/self.plane_1_norm_z))*x_t
-                         + (-(self.plane_1_norm_y/self.plane_1_norm_z))*y_t)
-                self.plane_1.mlab_source.set(z=z_new)
-                # self.scene.mlab.process_ui_elements()
-        elif self.show_plane_1 and self.dim == '2':
-            self.plane_1.visible = False
-            self.line_1.visible = True
-            if self.plane_1_norm_y == 0:
-                self.line_1.mlab_source.set(x=np.zeros_like(t), y=t)
-                # self.scene.mlab.process_ui_elements()
-            else:
-                y_new = (-(self.plane_1_norm_x/self.plane_1_norm_y))*t
-                self.line_1.mlab_source.set(y=y_new)
-                # self.scene.mlab.process_ui_elements()
-        else:
-            self.line_1.visible = False
-            self.plane_1.visible = False
-
-    @observe('show_plane_2,plane_2_norm_x,plane_2_norm_y,plane_2_norm_z,dim')
-    def edit_plane_2(self, event=None):
-        x_t, y_t = np.mgrid[-25:25:100j, -25:25:100j]
-        t = np.linspace(-25, 25, 100)
-        if self.show_plane_2 and self.dim == '3':
-            self.line_2.visible = False
-            self.plane_2.visible = True
-            if self.plane_2_norm_z == 0:
-                if self.plane_2_norm_y == 0:
-                    if self.plane_2_norm_x == 0:
-                        self.plane_2.visible = False
-                    else:
-                        self.plane_2.mlab_source.set(x=np.zeros_like(y_t),
-                                                     y=x_t, z=y_t)
-                    # self.scene.mlab.process_ui_elements()
-                else:
-                    y_new = (-(self.plane_2_norm_x/self.plane_2_norm_y))*x_t
-                    self.plane_2.mlab_source.set(x=x_t, y=y_new, z=y_t)
-                    # self.scene.mlab.process_ui_elements()
-            else:
-                z_new = ((-(self.plane_2_norm_x/self.plane_2_norm_z))*x_t
-                         + (-(self.plane_2_norm_y/self.plane_2_norm_z))*y_t)
-                self.plane_2.mlab_source.set(z=z_new)
-                # self.scene.mlab.process_ui_elements()
-        elif self.show_plane_2 and self.dim == '2':
-            self.plane_2.visible = False
-            self.line_2.visible = True
-            if self.plane_2_norm_y == 0:
-                self.line_2.mlab_source.set(x=np.zeros_like(t), y=t)
-                # self.scene.mlab.process_ui_elements()
-            else:
-                y_new = (-(self.plane_2_norm_x/self.plane_2_norm_y))*t
-                self.line_2.mlab_source.set(y=y_new)
-                # self.scene.mlab.process_ui_elements()
-        else:
-            self.line_2.visible = False
-            self.plane_2.visible = False
-
-    @observe('show_plane_3,plane_3_norm_x,plane_3_norm_y,plane_3_norm_z,dim')
-    def edit_plane_3(self, event=None):
-        x_t, y_t = np.mgrid[-25:25:100j, -25:25:100j]
-        t = np.linspace(-25, 25, 100)
-        if self.show_plane_3 and self.dim == '3':
-            self.line_3.visible = False
-            self.plane_3.visible = True
-            if self.plane_3_norm_z == 0:
-                if self.plane_3_norm_y == 0:
-                    if self.plane_3_norm_x == 0:
-                        self.plane_3.visible = False
-                    else:
-                        self.plane_3.mlab_source.set(x=np.zeros_like(y_t),
-                                                     y=x_t, z=y_t)
-                    # self.scene.mlab.process_ui_elements()
-                else:
-                    y_new = (-(self.plane_3_norm_x/self.plane_3_norm_y))*x_t
-                    self.plane_3.mlab_source.set(x=x_t, y=y_new, z=y_t)
-                    # self.scene.mlab.process_ui_elements()
-            else:
-                z_new = ((-(self.plane_3_norm_x/self.plane_3_norm_z))*x_t
-                         + (-(self.plane_3_norm_y/self.plane_3_norm_z))*y_t)
-                self.plane_3.mlab_source.set(z=z_new)
-                # self.scene.mlab.process_ui_elements()
-        elif self.show_plane_3 and self.dim == '2':
-            self.plane_3.visible = False
-            self.line_3.visible = True
-            if self.plane_3_norm_y == 0:
-                self.line_3.mlab_source.set(x=np.zeros_like(t), y=t)
-                # self.scene.mlab.process_ui_elements()
-            else:
-                y_new = (-(self.plane_3_norm_x/self.plane_3_norm_y))*t
-                self.line_3.mlab_source.set(y=y_new)
-                # self.scene.mlab.process_ui_elements()
-        else:
-            self.line_3.visible = False
-            self.plane_3.visible = False
-
-    @observe('show_plane_4,plane_4_norm_x,plane_4_norm_y,plane_4_norm_z,dim')
-    def edit_plane_4(self, event=None):
-        x_t, y_t = np.mgrid[-25:25:100j, -25:25:100j]
-        t = np.linspace(-25, 25, 100)
-        if self.show_plane_4 and self.dim == '3':
-            self.line_4.visible = False
-            self.plane_4.visible = True
-            if self.plane_4_norm_z == 0:
-                if self.plane_4_norm_y == 0:
-                    if self.plane_4_norm_x == 0:
-                        self.plane_4.visible = False
-                    else:
-                        self.plane_4.mlab_source.set(x=np.zeros_like(y_t),
-                                                     y=x_t,
-                                                     z=y_t)
-                    # self.scene.mlab.process_ui_elements()
-                else:
-                    y_new = (-(self.plane_4_norm_x/self.plane_4_norm_y))*x_t
-                    self.plane_4.mlab_source.set(x=x_t, y=y_new, z=y_t)
-                    # self.scene.mlab.process_ui_elements()
-            else:
-                z_new = ((-(self.plane_4_norm_x/self.plane_4_norm_z))*x_t
-                         + (-(self.plane_4_norm_y/self.plane_4_norm_z))*y_t)
-                self.plane_4.mlab_source.set(z=z_new)
-                # self.scene.mlab.process_ui_elements()
-        elif self.show_plane_4 and self.dim == '2':
-            self.plane_4.visible = False
-            self.line_4.visible = True
-            if self.plane_4_norm_y == 0:
-                self.line_4.mlab_source.set(x=np.zeros_like(t), y=t)
-                # self.scene.mlab.process_ui_elements()
-            else:
-                y_new = (-(self.plane_4_norm_x/self.plane_4_norm_y))*t
-                self.line_4.mlab_source.set(y=y_new)
-                # self.scene.mlab.process_ui_elements()
+        self.scheduler.mark('axes')
+
+    @observe('hyperplanes.items.[norm_x,norm_y,norm_z,offset,show],dim,'
+             'show_circles')
+    @profiled
+    def edit_planes(self, event=None):
+        # Table edits stay at full detail: the layers only redraw the
+        # edited row, while a switch to coarse meshes would redraw them all.
+        self.scheduler.mark('planes', 'circles')
+
+    def _shown_indices(self):
+        normals = self._arrangement().normals[:, :int(self.dim)]
+        shown = np.array([plane.show for plane in self.hyperplanes],
+                         dtype=bool)
+        return np.nonzero(shown & np.any(normals != 0, axis=1))[0]
+
+    def _shown_arrangement(self):
+        arrangement = self._arrangement()
+        indices = self._shown_indices()
+        return Arrangement(arrangement.normals[indices, :int(self.dim)],
+                           arrangement.offsets[indices])
+
+    def _statistics_arrangement(self):
+        if self._affine():
+            return affine_arrangement(self.refl_arr_type)
+        if self.ira and self.dim == '3':
+            groups = ARRANGEMENT_GROUPS.get(self.refl_arr_type, ())
+            return Arrangement(np.vstack([REFLECTION_GROUPS[g]
+                                          for g in groups]))
+        if self.ira:
+            return Arrangement(dihedral_arrangement(
+                self.dihedral_arrangement_n)['normals'])
+        return self._shown_arrangement()
+
+    @observe('hyperplanes.items.[norm_x,norm_y,norm_z,offset,show],dim,ira,'
+             'refl_arr_type,dihedral_arrangement_n')
+    @profiled
+    def update_statistics(self, event=None):
+        # Counting waits until the edits stop and then runs in a flush,
+        # so typing in the table only pays for the redraw.
+        self._last_edit = time.perf_counter()
+        do_after(STATISTICS_DELAY, self._statistics_idle)
+
+    def _statistics_idle(self):
+        idle = time.perf_counter() - self._last_edit
+        if idle >= STATISTICS_DELAY/1000.:
+            self.scheduler.mark('statistics')
+
+    def _count_statistics(self):
+        if self._sliced():
+            # The lattice of E8 is far too big to build; Coxeter
+            # arrangements factor over their exponents instead.
+            chi = coxeter_polynomial(*SLICED_TYPES[self.refl_arr_type])
+            self.generic = False
         else:
-            self.line_4.visible = False
-            self.plane_4.visible = False
+            arrangement = self._statistics_arrangement()
+            key = self._key(arrangement, kind='chi')
+            entry = self.geometry_cache.get(key)
+            if entry is None:
+                chi = characteristic_polynomial(arrangement.normals,
+                                                arrangement.offsets)
+                entry = self.geometry_cache.put(key, {'chi': chi})
+            chi = entry['chi']
+            key = self._key(arrangement, kind='generic')
+            entry = self.geometry_cache.get(key)
+            if entry is None:
+                entry = self.geometry_cache.put(
+                    key, {'generic': general_position(arrangement.normals)})
+            self.generic = bool(entry['generic'])
+        self.char_poly = format_polynomial(chi)
+        self.n_regions = int(abs(np.polyval(chi, -1)))
+        self.n_bounded = int(abs(np.polyval(chi, 1)))
+
+    # Replaces the hyperplanes by a random arrangement in R^dim (see
+    # random_arrangements.py for the kinds); the perturbed reflection
+    # arrangements bring their own number of hyperplanes.
+    @observe('randomize')
+    @profiled
+    def random_arrangement(self, event=None):
+        dim = int(self.dim)
+        normals = generate(self.random_kind, 1, self.random_count, dim)[0]
+        self.hyperplanes = [
+            Hyperplane(norm_x=row[0], norm_y=row[1],
+                       norm_z=row[2] if dim == 3 else 0., show=True)
+            for row in normals.tolist()]
+
+    @observe('interacting,resolution,adaptive_detail')
+    @profiled
+    def change_detail(self, event=None):
+        self.scheduler.mark('planes', 'chambers', 'circles', 'slice',
+                            'affine')
 
     @observe('ira,refl_arr_type,dim,view_cox')
+    @profiled
     def refl_arr(self, event=None):
-        self.scp_coord_b_1.implicit_plane.widget.enabled = False
-        self.scp_coord_b_2.implicit_plane.widget.enabled = False
-        self.scp_coord_b_3.implicit_plane.widget.enabled = False
-        self.scp_abd_1.implicit_plane.widget.enabled = False
-        self.scp_abd_2.implicit_plane.widget.enabled = False
-        self.scp_abd_3.implicit_plane.widget.enabled = False
-        self.scp_bd_1.implicit_plane.widget.enabled = False
-        self.scp_bd_2.implicit_plane.widget.enabled = False
-        self.scp_bd_3.implicit_plane.widget.enabled = False
-        cond_temp = self.refl_arr_type == 'Coordinate Arrangement'
-        cond_1 = cond_temp and self.dim == '3'
-        cond_2 = self.refl_arr_type == 'Type A' and self.dim == '3'
-        cond_3 = self.refl_arr_type == 'Type B' and self.dim == '3'
-        cond_4 = self.refl_arr_type == 'Type D' and self.dim == '3'
-
         if self.ira:
-            self.show_plane_1 = False
-            self.show_plane_2 = False
-            self.show_plane_3 = False
-            self.show_plane_4 = False
+            for plane in self.hyperplanes:
+                plane.show = False
             self.show_axes = False
-        if (self.ira and cond_1 and self.view_cox):
-            self.scp_coord_b_1.visible = True
-            self.scp_coord_b_2.visible = True
-            self.scp_coord_b_3.visible = True
-            self.scp_abd_1.visible = False
-            self.scp_abd_2.visible = False
-            self.scp_abd_3.visible = False
-            self.scp_bd_1.visible = False
-            self.scp_bd_2.visible = False
-            self.scp_bd_3.visible = False
-            self.circle.visible = False
-        elif (self.ira and cond_2 and self.view_cox):
-            self.scp_coord_b_1.visible = False
-            self.scp_coord_b_2.visible = False
-            self.scp_coord_b_3.visible = False
-            self.scp_abd_1.visible = True
-            self.scp_abd_2.visible = True
-            self.scp_abd_3.visible = True
-            self.scp_bd_1.visible = False
-            self.scp_bd_2.visible = False
-            self.scp_bd_3.visible = False
-            self.circle.visible = False
-        elif (self.ira and cond_3 and self.view_cox):
-            self.scp_coord_b_1.visible = True
-            self.scp_coord_b_2.visible = True
-            self.scp_coord_b_3.visible = True
-            self.scp_abd_1.visible = True
-            self.scp_abd_2.visible = True
-            self.scp_abd_3.visible = True
-            self.scp_bd_1.visible = True
-            self.scp_bd_2.visible = True
-            self.scp_bd_3.visible = True
-            self.circle.visible = False
-        elif (self.ira and cond_4 and self.view_cox):
-            self.scp_coord_b_1.visible = False
-            self.scp_coord_b_2.visible = False
-            self.scp_coord_b_3.visible = False
-            self.scp_abd_1.visible = True
-            self.scp_abd_2.visible = True
-            self.scp_abd_3.visible = True
-            self.scp_bd_1.visible = True
-            self.scp_bd_2.visible = True
-            self.scp_bd_3.visible = True
-            self.circle.visible = False
-        elif (self.ira and self.dim == '2'):
-            self.scp_coord_b_1.visible = False
-            self.scp_coord_b_2.visible = False
-            self.scp_coord_b_3.visible = False
-            self.scp_abd_1.visible = False
-            self.scp_abd_2.visible = False
-            self.scp_abd_3.visible = False
-            self.scp_bd_1.visible = False
-            self.scp_bd_2.visible = False
-            self.scp_bd_3.visible = False
-            self.circle.visible = True
-        else:
-            self.scp_coord_b_1.visible = False
-            self.scp_coord_b_2.visible = False
-            self.scp_coord_b_3.visible = False
-            self.scp_abd_1.visible = False
-            self.scp_abd_2.visible = False
-            self.scp_abd_3.visible = False
-            self.scp_bd_1.visible = False
-            self.scp_bd_2.visible = False
-            self.scp_bd_3.visible = False
-            self.circle.visible = False
+        self.scheduler.mark('chambers', 'circles')
 
     @observe('dim,ira,view_cox,refl_arr_type')
+    @profiled
     def cox_cell(self, event=None):
-        self.coord_b_1.visible = False
-        self.coord_b_2.visible = False
-        self.coord_b_3.visible = False
-        self.abd_1.visible = False
-        self.abd_2.visible = False
-        self.abd_3.visible = False
-        self.bd_1.visible = False
-        self.bd_2.visible = False
-        self.bd_3.visible = False
-        c_temp = self.ira and self.dim == '3' and (not self.view_cox)
-        cond_1 = c_temp and self.refl_arr_type == 'Coordinate Arrangement'
-        cond_2 = c_temp and self.refl_arr_type == 'Type A'
-        cond_3 = c_temp and self.refl_arr_type == 'Type B'
-        cond_4 = c_temp and self.refl_arr_type == 'Type D'
-        if cond_1:
-            self.coord_b_1.visible = True
-            self.coord_b_2.visible = True
-            self.coord_b_3.visible = True
-        elif cond_2:
-            self.abd_1.visible = True
-            self.abd_2.visible = True
-            self.abd_3.visible = True
-        elif cond_3:
-            self.coord_b_1.visible = True
-            self.coord_b_2.visible = True
-            self.coord_b_3.visible = True
-            self.abd_1.visible = True
-            self.abd_2.visible = True
-            self.abd_3.visible = True
-            self.bd_1.visible = True
-            self.bd_2.visible = True
-            self.bd_3.visible = True
-        elif cond_4:
-            self.abd_1.visible = True
-            self.abd_2.visible = True
-            self.abd_3.visible = True
-            self.bd_1.visible = True
-            self.bd_2.visible = True
-            self.bd_3.visible = True
-        elif self.ira and self.dim == '2':
+        if self.ira and self.dim == '2':
             self.view_cox = True
         elif not self.ira:
             self.view_cox = False
-        else:
-            pass
+        self.scheduler.mark('cells')
+
+    def _sliced(self):
+        return (self.ira and self.dim == '3'
+                and self.refl_arr_type in SLICED_TYPES)
+
+    @observe('ira,refl_arr_type,dim,slice_offset')
+    @profiled
+    def slice_arr(self, event=None):
+        if event is not None and event.name == 'slice_offset':
+            self._start_interaction()
+            self._end_interaction()
+        self.scheduler.mark('slice')
+
+    def _affine(self):
+        return (self.ira and self.dim == '3'
+                and self.refl_arr_type in AFFINE_TYPES)
+
+    @observe('ira,refl_arr_type,dim')
+    @profiled
+    def affine_arr(self, event=None):
+        self.scheduler.mark('affine')
 
     @observe('dim,ira,dihedral_arrangement_n')
+    @profiled
     def dihedral_arr(self, event=None):
+        self.scheduler.mark('dihedral')
+
+    def session_state(self):
+        state = self.trait_get(*SESSION_TRAITS)
+        state['show'] = [plane.show for plane in self.hyperplanes]
+        state['offsets'] = [plane.offset for plane in self.hyperplanes]
+        return state
+
+    def save_to(self, path):
+        save_session(path, self._arrangement().normals, self.session_state(),
+                     self.geometry_cache, self.row_cache)
+
+    def restore(self, path):
+        normals, state, entries, rows = load_session(path)
+        self.geometry_cache.update(entries)
+        for key, points, visible in rows:
+            self.row_cache.put(key, points, visible)
+        show = state.pop('show')
+        offsets = state.pop('offsets', [0.]*len(show))
+        self.hyperplanes = [
+            Hyperplane(norm_x=x, norm_y=y, norm_z=z, offset=offset,
+                       show=shown)
+            for (x, y, z), offset, shown in zip(normals.tolist(), offsets,
+                                                show)]
+        self.trait_set(**state)
+
+    @observe('save')
+    @profiled
+    def save_state(self, event=None):
+        self.save_to(self.session_file)
+
+    @observe('load')
+    @profiled
+    def load_state(self, event=None):
+        self.restore(self.session_file)
+
+    # An animation goes from the hyperplanes stored by Set Keyframe to the
+    # current ones. All frames are sampled up front; the timer then only
+    # copies one frame into the actor's points per tick.
+    @observe('set_keyframe')
+    @profiled
+    def store_keyframe(self, event=None):
+        self._keyframe = self._arrangement()
+
+    def _animation_frames(self):
+        start, end = self._keyframe, self._arrangement()
+        if start is None or len(start) != len(end):
+            return None
+        dim = int(self.dim)
+        kind = 'surfaces' if self.dim == '3' else 'lines'
+        pts, visible = keyframe_geometry(
+            start.normals[:, :dim], end.normals[:, :dim],
+            self.animation_frames, self.resolution, kind,
+            start.offsets, end.offsets)
+        shown = np.array([plane.show for plane in self.hyperplanes],
+                         dtype=bool)
+        pts[~(visible & shown)] = 0.
+        name = 'planes' if self.dim == '3' else 'lines'
+        self._set_visible('lines' if name == 'planes' else 'planes',
+                          visible=False)
+        actor = self._actor(name)
+        if name == 'planes':
+            buffer = self._mesh_buffer(actor, pts.shape[1:])
+        else:
+            buffer = self._polyline_buffer(actor, pts.shape[1:])
+        # The frames overwrite the rows the layer knows about.
+        self.layers.pop(name, None)
+        actor.visible = True
+        return actor, buffer, pts
+
+    @observe('animate')
+    @profiled
+    def play_animation(self, event=None):
+        if self.engine is None or self._animation is not None:
+            return
+        frames = self._animation_frames()
+        if frames is None:
+            return
+        self._animation = frames
+        self._frame = 0
+        self._timer = Timer(self.frame_interval, self._next_frame)
+
+    def _next_frame(self):
+        actor, buffer, pts = self._animation
+        np.copyto(buffer, pts[self._frame])
+        self._update_source(actor)
+        self._frame += 1
+        if self._frame == len(pts):
+            self._timer.Stop()
+            self._animation = None
+            self.scheduler.mark('planes')
+
+    @observe('export_animation')
+    @profiled
+    def export_frames(self, event=None):
+        if self.engine is None or self._animation is not None:
+            return
+        frames = self._animation_frames()
+        if frames is None:
+            return
+        actor, buffer, pts = frames
+        images = []
+        for frame in pts:
+            np.copyto(buffer, frame)
+            self._update_source(actor)
+            images.append(self.scene.mlab.screenshot(
+                figure=self.scene.mayavi_scene))
+        save_frames(images, self.animation_file,
+                    fps=1000./self.frame_interval)
+        self.scheduler.mark('planes')
+
+    # Picking intersects the mouse ray with every hyperplane at once
+    # (Arrangement.pick) instead of asking VTK to pick among the actors,
+    # so hovering costs the same however many planes are shown.
+    def _pick_ray(self, x, y):
+        renderer = self.scene.renderer
+        ends = []
+        for depth in (0., 1.):
+            renderer.display_point = (x, y, depth)
+            renderer.display_to_world()
+            point = np.array(renderer.world_point)
+            ends.append(point[:3]/point[3])
+        return ends[0], ends[1] - ends[0]
+
+    def _pick_target(self):
+        # The arrangement on screen and labels for its hyperplanes. For
+        # reflection arrangements also the normals and simple roots in the
+        # group's own space, with the map into it from scene coordinates.
+        if self.ira and self.dim == '3' and self._sliced():
+            normals, basis, point = self._slice()
+            return (Arrangement(normals).slice(basis, point),
+                    np.arange(len(normals)), normals,
+                    simple_roots(*SLICED_TYPES[self.refl_arr_type]),
+                    lambda y: point + basis @ y)
+        if self._affine():
+            arrangement = affine_arrangement(self.refl_arr_type)
+            return arrangement, np.arange(len(arrangement)), None, None, None
+        if self.ira:
+            normals = self._statistics_arrangement().normals
+            if self.dim == '3':
+                simple = SIMPLE_ROOTS[self.refl_arr_type]
+            else:
+                angle = np.pi/self.dihedral_arrangement_n
+                simple = np.array([[0., 1.],
+                                   [np.sin(angle), -np.cos(angle)]])
+            return (Arrangement(normals), np.arange(len(normals)), normals,
+                    simple, lambda y: y)
+        indices = self._shown_indices()
+        if not len(indices):
+            return None
+        return self._shown_arrangement(), indices, None, None, None
+
+    def _pick(self, origin, direction):
+        target = self._pick_target()
+        if target is None:
+            return ''
+        arrangement, labels, normals, simple, lift = target
+        if arrangement.dim == 3:
+            index, hit, inside = arrangement.pick(origin, direction)
+            if index < 0:
+                return 'nothing under the cursor'
+        else:
+            # Lines are picked where the ray meets the z = 0 plane, within
+            # the radius of their tubes.
+            if direction[2] == 0:
+                return ''
+            inside = (origin - origin[2]/direction[2]*direction)[:2]
+            if np.linalg.norm(inside) > EXTENT:
+                return 'nothing under the cursor'
+            norms = np.linalg.norm(arrangement.normals, axis=1)
+            distance = np.abs(arrangement.normals @ inside
+                              - arrangement.offsets)/norms
+            index = int(np.argmin(distance)) if distance.min() < 0.7 else -1
+        sign = arrangement.signs(inside)[0]
+
+        parts = []
+        if index >= 0:
+            parts.append('hyperplane %d' % (labels[index] + 1))
+        parts.append('chamber ' + ''.join('0+-'[s] for s in sign))
+        if simple is None:
+            key = self._key(arrangement, kind='regions')
+            entry = self.geometry_cache.get(key)
+            if entry is None:
+                entry = self.geometry_cache.put(
+                    key, {'signs': arrangement.regions()[0]})
+            bounding = walls(sign, entry['signs'])
+        else:
+            word = chamber_word(simple, lift(inside))
+            unit, _ = unit_normals(normals)
+            wall_unit, _ = unit_normals(chamber_walls(simple, word))
+            parallel = np.abs(unit @ wall_unit.T) > 1 - 1e-9
+            bounding = np.nonzero(parallel.any(axis=1))[0]
+        parts.append('walls ' + ', '.join(str(labels[i] + 1)
+                                          for i in bounding))
+        if simple is not None:
+            parts.append('w = %s (length %d)' % (format_word(word),
+                                                 len(word)))
+        return ' | '.join(parts)
+
+    def _hover(self, obj=None, event=None):
+        if not self.picking or self.engine is None:
+            return
+        x, y = obj.GetEventPosition()
+        origin, direction = self._pick_ray(x, y)
+        with self._span('pick', 'pick'):
+            self.pick_info = self._pick(origin, direction)
+
+    def _draw_axes(self):
+        if self.show_axes:
+            x_axis, y_axis, z_axis = self._actor('axes')
+            x_axis.visible = True
+            y_axis.visible = True
+            z_axis.visible = self.dim == '3'
+        else:
+            self._set_visible('axes', visible=False)
+
+    def _draw_planes(self):
+        arrangement = self._arrangement()
+        shown = np.array([plane.show for plane in self.hyperplanes],
+                         dtype=bool)
+        res = self._detail()[0]
+        if not shown.any():
+            self._set_visible('lines', visible=False)
+            self._set_visible('planes', visible=False)
+            return
+        # Hidden hyperplanes collapse to the origin, which keeps the merged
+        # topology fixed while planes are toggled on and off.
+        if self.dim == '3':
+            self._set_visible('lines', visible=False)
+            actor = self._actor('planes')
+            visible = self._fill('planes', actor, arrangement, 'surfaces',
+                                 res, shown)
+        else:
+            self._set_visible('planes', visible=False)
+            actor = self._actor('lines')
+            visible = self._fill('lines', actor, arrangement, 'lines', res,
+                                 shown)
+        actor.visible = bool(visible.any())
+
+    def _reflection_groups(self, view_cox):
+        if self.ira and self.dim == '3' and self.view_cox == view_cox:
+            return ARRANGEMENT_GROUPS.get(self.refl_arr_type, ())
+        return ()
+
+    # The Coxeter cell view colours the chambers on the sphere mesh itself:
+    # every vertex is labelled by its packed sign vector, so one scalar
+    # array replaces a cut filter per plane.
+    def _draw_chambers(self):
+        self._set_visible('circle', visible=self.ira and self.dim == '2')
+        groups = self._reflection_groups(view_cox=True)
+        if not groups:
+            self._set_visible('sphere', visible=False)
+            return
+        sphere = self._actor('sphere')
+        res = self._detail()[1]
+        x, y, z = sphere_data(resolution=res)
+        normals = np.vstack([REFLECTION_GROUPS[g] for g in groups])
+        key = content_hash(normals, kind='chambers', resolution=res)
+        entry = self.geometry_cache.get(key)
+        if entry is None:
+            points = np.column_stack([x.ravel(), y.ravel(), z.ravel()])
+            with self._span('chamber_labels', 'geometry', n=len(normals),
+                            res=res):
+                labels, count = chamber_labels(points, normals)
+            # Shuffle the labels so that neighbouring chambers get
+            # different colours.
+            order = np.random.default_rng(0).permutation(count)
+            entry = self.geometry_cache.put(
+                key, {'labels': order[labels].reshape(x.shape)})
+        if sphere.mlab_source.x.shape != x.shape:
+            sphere.mlab_source.reset(x=x, y=y, z=z, scalars=entry['labels'])
+        elif key != self._chamber_key:
+            sphere.mlab_source.set(scalars=entry['labels'])
+        self._chamber_key = key
+        sphere.visible = True
+
+    # The walls of the chambers, and the shown hyperplanes when Show
+    # Circles is ticked, are drawn where they meet the sphere: circles
+    # computed in one batch (Arrangement.circles) and joined into a single
+    # tube actor, instead of cutting the sphere dataset once per plane.
+    def _circle_arrangement(self):
+        groups = self._reflection_groups(view_cox=True)
+        if groups:
+            return Arrangement(np.vstack([REFLECTION_GROUPS[g]
+                                          for g in groups]))
+        if self.show_circles and not self.ira and self.dim == '3':
+            return self._shown_arrangement()
+        return None
+
+    def _draw_circles(self):
+        arrangement = self._circle_arrangement()
+        if arrangement is None or not len(arrangement):
+            self._set_visible('circles', visible=False)
+            return
+        res = self._detail()[1] + 1
+        actor = self._actor('circles')
+        self._fill('circles', actor, arrangement, 'circles', res,
+                   extent=1.005*EXTENT)
+        actor.visible = True
+
+    def _draw_cells(self):
+        groups = self._reflection_groups(view_cox=False)
+        for group in REFLECTION_GROUPS:
+            self._set_visible('cells', group, visible=group in groups)
+
+    def _draw_slice(self):
+        if not self._sliced():
+            self._set_visible('slice', visible=False)
+            return
+        arrangement = self._sliced_arrangement()
+        res = self._detail()[0]
+        actor = self._actor('slice')
+        self._fill('slice', actor, arrangement, 'surfaces', res)
+        actor.visible = True
+
+    # The bounded regions of an affine arrangement are one mesh, coloured
+    # by region, inside the translucent planes.
+    def _bounded_mesh(self):
+        arrangement = affine_arrangement(self.refl_arr_type)
+        key = self._key(arrangement, kind='bounded')
+        entry = self.geometry_cache.get(key)
+        if entry is None:
+            with self._span('bounded_mesh', 'geometry', n=len(arrangement)):
+                points, triangles, region = arrangement.bounded_mesh()
+            order = np.random.default_rng(0).permutation(
+                max(region.max() + 1, 1) if len(region) else 1)
+            entry = self.geometry_cache.put(
+                key, {'points': points, 'triangles': triangles,
+                      'labels': order[region]})
+        return entry['points'], entry['triangles'], entry['labels']
+
+    def _draw_affine(self):
+        if not self._affine():
+            self._set_visible('affine', visible=False)
+            self._set_visible('bounded', visible=False)
+            return
+        arrangement = affine_arrangement(self.refl_arr_type)
+        res = self._detail()[0]
+        actor = self._actor('affine')
+        self._fill('affine', actor, arrangement, 'surfaces', res)
+        actor.visible = True
+
+        points, triangles, labels = self._bounded_mesh()
+        if not len(triangles):
+            self._set_visible('bounded', visible=False)
+            return
+        bounded = self._actor('bounded')
+        if self._bounded_key != self.refl_arr_type:
+            bounded.mlab_source.reset(x=points[:, 0], y=points[:, 1],
+                                      z=points[:, 2], triangles=triangles,
+                                      scalars=labels)
+            self._bounded_key = self.refl_arr_type
+        bounded.visible = True
+
+    def _exploring(self):
+        return (self.explore and self.ira and self.dim == '3'
+                and self.refl_arr_type in SIMPLE_ROOTS)
+
+    @observe('explore,ira,dim,refl_arr_type')
+    @profiled
+    def explore_group(self, event=None):
+        if self._exploring():
+            self.last_element = len(reflection_group(self.refl_arr_type)) - 1
+            self.element = min(self.element, self.last_element)
+        self.show_element()
+
+    @observe('element')
+    @profiled
+    def show_element(self, event=None):
+        if self._exploring():
+            group = reflection_group(self.refl_arr_type)
+            word = group.words[self.element]
+            below = len(group.bruhat_below(self.element))
+            self.element_info = ('w = %s (length %d), %d of %d elements '
+                                 'below it in Bruhat order'
+                                 % (format_word(word), len(word), below,
+                                    len(group)))
+        else:
+            self.element_info = ''
+        self.scheduler.mark('element')
+
+    def _draw_element(self):
+        if not self._exploring():
+            self._set_visible('element', visible=False)
+            return
+        # All rank 3 patches share their faces; the two-triangle patch of
+        # type A is twice the size and resets the source.
+        points, faces = fundamental_patch(self.refl_arr_type)
+        actor = self._actor('element')
+        if len(actor.mlab_source.points) != len(points):
+            actor.mlab_source.reset(x=points[:, 0], y=points[:, 1],
+                                    z=points[:, 2], triangles=faces)
+        matrix = reflection_group(self.refl_arr_type).matrices[self.element]
+        np.matmul(points, matrix.T, out=actor.mlab_source.points)
+        self._update_source(actor)
+        actor.visible = True
+
+    def _draw_dihedral(self):
         if self.dim == '2' and self.ira:
+            points_e, points_o = self._actor('dihedral')
             x_e, y_e, x_o, y_o = dihedral_data(self.dihedral_arrangement_n)
-            z = np.zeros_like(x_e)
-            self.dihedral_points_e.mlab_source.reset(x=x_e, y=y_e, z=z)
-            self.dihedral_points_o.mlab_source.reset(x=x_o, y=y_o, z=z)
-            self.dihedral_points_e.visible = True
-            self.dihedral_points_o.visible = True
+            self._set_glyph_points(points_e, x_e, y_e)
+            self._set_glyph_points(points_o, x_o, y_o)
+            points_e.visible = True
+            points_o.visible = True
         else:
-            self.dihedral_points_e.visible = False
-            self.dihedral_points_o.visible = False
+            self._set_visible('dihedral', visible=False)
+
+    # Glyph sources are sized to a power of two and the unused tail repeats
+    # the last point, so changing n rewrites the points in place and only
+    # rebuilds the source when it outgrows its capacity.
+    def _set_glyph_points(self, glyph, x, y):
+        source = glyph.mlab_source
+        count = len(x)
+        if count > len(source.points):
+            capacity = 2**int(np.ceil(np.log2(count)))
+            zeros = np.zeros(capacity)
+            source.reset(x=zeros, y=zeros, z=zeros)
+        pts = source.points
+        pts[:count, 0] = x
+        pts[:count, 1] = y
+        pts[:count, 2] = 0.
+        pts[count:] = pts[count - 1]
+        source.update()
+
     # The layout of the dialog created
     view = View(HSplit(Item('scene',
                             editor=SceneEditor(scene_class=MayaviScene),
@@ -652,6 +1112,17 @@ class Vis(HasTraits):
                     Group(
                         Item(name='show_axes', label='Show Axes'),
                         Item(name='dim', label='Ambient Space Dim.'),
+                        Item(name='resolution', label='Mesh Resolution'),
+                        Item(name='adaptive_detail',
+                             label='Coarse While Moving'),
+                        Item(name='picking', label='Pick on Hover'),
+                        Item(name='pick_info', label='Picked',
+                             style='readonly', enabled_when='picking'),
+                        Item(name='profiling', label='Profile'),
+                        Item(name='trace_file', label='Trace File',
+                             enabled_when='profiling'),
+                        Item(name='dump_trace', show_label=False,
+                             enabled_when='profiling'),
                         label='General',
                         show_border=True
                      ),
@@ -664,51 +1135,60 @@ class Vis(HasTraits):
                         Item(name='refl_arr_type',
                              enabled_when='ira is True and dim=="3"',
                              label='Arrangement Type'),
+                        Item(name='slice_offset', label='Slice Offset',
+                             enabled_when='object._sliced()'),
+                        Item(name='explore', label='Explore Group',
+                             enabled_when='ira is True and dim=="3"'),
+                        Item(name='element', label='Element',
+                             enabled_when='object._exploring()'),
+                        Item(name='element_info', style='readonly',
+                             show_label=False),
                         Item(name='view_cox',
                              label='View Coxeter Cell',
                              enabled_when='ira is True and dim=="3"'),
                         label='Reflection Arrangements',
                         show_border=True
                      )),
-                    HGroup(
-                        Item(name='plane_1_norm_x', label='x'),
-                        Item(name='plane_1_norm_y', label='y'),
-                        Item(name='plane_1_norm_z', label='z',
-                             enabled_when='dim == "3"'),
-                        Item(name='show_plane_1', label='Show'),
-                        label='Hyperplane 1 (Normal)',
-                        show_border=True,
-                        enabled_when='ira is False'
-                        ),
-                    HGroup(
-                        Item(name='plane_2_norm_x', label='x'),
-                        Item(name='plane_2_norm_y', label='y'),
-                        Item(name='plane_2_norm_z', label='z',
-                             enabled_when='dim == "3"'),
-                        Item(name='show_plane_2', label='Show'),
-                        label='Hyperplane 2 (Normal)',
+                    Group(
+                        Item(name='hyperplanes', editor=hyperplane_editor,
+                             show_label=False),
+                        Item(name='char_poly', label='Char. Polynomial',
+                             style='readonly'),
+                        Item(name='n_regions', label='Regions',
+                             style='readonly'),
+                        Item(name='n_bounded', label='Bounded Regions',
+                             style='readonly'),
+                        Item(name='generic', label='General Position',
+                             style='readonly'),
+                        Item(name='show_circles',
+                             label='Show Circles on Sphere',
+                             enabled_when='dim=="3"'),
+                        HSplit(Item(name='random_kind', label='Random'),
+                               Item(name='random_count', label='Count'),
+                               Item(name='randomize', show_label=False)),
+                        label='Hyperplanes (Normals)',
                         show_border=True,
                         enabled_when='ira is False'
                         ),
-                    HGroup(
-                        Item(name='plane_3_norm_x', label='x'),
-                        Item(name='plane_3_norm_y', label='y'),
-                        Item(name='plane_3_norm_z', label='z',
-                             enabled_when='dim == "3"'),
-                        Item(name='show_plane_3', label='Show'),
-                        label='Hyperplane 3 (Normal)',
+                    Group(
+                        Item(name='animation_frames', label='Frames'),
+                        Item(name='frame_interval',
+                             label='Frame Interval (ms)'),
+                        Item(name='animation_file', label='File'),
+                        HSplit(Item(name='set_keyframe', show_label=False),
+                               Item(name='animate', show_label=False),
+                               Item(name='export_animation',
+                                    show_label=False)),
+                        label='Animation',
                         show_border=True,
                         enabled_when='ira is False'
                         ),
-                    HGroup(
-                        Item(name='plane_4_norm_x', label='x'),
-                        Item(name='plane_4_norm_y', label='y'),
-                        Item(name='plane_4_norm_z', label='z',
-                             enabled_when='dim == "3"'),
-                        Item(name='show_plane_4', label='Show'),
-                        label='Hyperplane 4 (Normal)',
-                        show_border=True,
-                        enabled_when='ira is False'
+                    Group(
+                        Item(name='session_file', label='File'),
+                        HSplit(Item(name='save', show_label=False),
+                               Item(name='load', show_label=False)),
+                        label='Session',
+                        show_border=True
                         ))),
                 resizable=True,
                 buttons=[CancelButton]
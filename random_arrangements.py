@@ -0,0 +1,201 @@
+"""Random central arrangements, a general position test and batch statistics.
+
+Usage::
+
+    python random_arrangements.py uniform -n 10 -d 3 --arrangements 10000 \\
+        --workers 4
+
+Kinds of arrangement:
+
+    uniform    normals uniform on the unit sphere S^(d-1)
+    lattice    integer normals with entries in [-bound, bound]
+    A, B, D    the reflection arrangement of that type in R^d, with every
+               normal perturbed by Gaussian noise of size `scale`
+
+Every generator returns a (B, N, d) batch. The statistics of a large run
+are computed in chunks across worker processes, each seeded from its own
+branch of one SeedSequence, so the result does not depend on the number
+of workers.
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+from math import comb
+
+import numpy as np
+
+from combinatorics import TOL, subsets, zaslavsky_count
+from root_systems import reflecting_hyperplanes
+
+KINDS = ('uniform', 'lattice', 'A', 'B', 'D')
+
+
+def uniform(size, count, dim, rng):
+    normals = rng.standard_normal((size, count, dim))
+    return normals/np.linalg.norm(normals, axis=-1, keepdims=True)
+
+
+def lattice(size, count, dim, rng, bound=2):
+    normals = rng.integers(-bound, bound + 1, size=(size, count, dim))
+    # Redraw the zero vectors, which are not hyperplanes.
+    zero = ~normals.any(axis=-1)
+    while zero.any():
+        normals[zero] = rng.integers(-bound, bound + 1,
+                                     size=(zero.sum(), dim))
+        zero = ~normals.any(axis=-1)
+    return normals.astype(float)
+
+
+def root_normals(family, dim):
+    """Normals of the reflection arrangement of `family` in R^dim."""
+    if family == 'A':
+        return reflecting_hyperplanes('A', dim - 1)
+    if family == 'B':
+        return reflecting_hyperplanes('B', dim)
+    if family == 'D':
+        # e_i - e_j and e_i + e_j; written out so that D2 and D3 exist.
+        i, j = np.triu_indices(dim, 1)
+        eye = np.eye(dim)
+        return np.vstack([eye[i] - eye[j], eye[i] + eye[j]])
+    raise ValueError('no reflection arrangement of type %r' % family)
+
+
+def perturbed(family, size, dim, rng, scale=0.05):
+    normals = root_normals(family, dim)
+    return normals + scale*rng.standard_normal((size,) + normals.shape)
+
+
+def generate(kind, size, count, dim, rng=None, scale=0.05, bound=2):
+    """A (size, count, dim) batch of random arrangements of one kind.
+
+    For the perturbed reflection arrangements the count is fixed by the
+    type and `count` is ignored.
+    """
+    rng = np.random.default_rng(rng)
+    if kind == 'uniform':
+        return uniform(size, count, dim, rng)
+    if kind == 'lattice':
+        return lattice(size, count, dim, rng, bound)
+    if kind in ('A', 'B', 'D'):
+        return perturbed(kind, size, dim, rng, scale)
+    raise ValueError('unknown kind of arrangement %r, expected one of %s'
+                     % (kind, ', '.join(KINDS)))
+
+
+def general_position(normals, tol=TOL):
+    """Whether central arrangements are in general position.
+
+    `normals` is one (N, d) arrangement or a (B, N, d) batch. Every d of
+    the normals (all of them when N < d) must be linearly independent.
+    The determinant of a d-subset S + {k} is the cofactor vector of S
+    dotted with n_k, so each chunk of (d-1)-subsets costs one batched
+    cofactor computation and one matmul against all normals. Arrangements
+    found degenerate are dropped and the loop stops as soon as none is
+    left.
+    """
+    normals = np.asarray(normals, dtype=float)
+    single = normals.ndim == 2
+    batch = normals[None] if single else normals
+    size, count, dim = batch.shape
+    norms = np.linalg.norm(batch, axis=-1, keepdims=True)
+    unit = np.divide(batch, norms, out=np.zeros_like(batch),
+                     where=norms != 0)
+    if count == 0:
+        generic = np.ones(size, dtype=bool)
+        return bool(generic[0]) if single else generic
+    if count < dim:
+        generic = np.linalg.svd(unit, compute_uv=False)[:, -1] > tol
+        return bool(generic[0]) if single else generic
+
+    faces = subsets(count, dim - 1)
+    last = faces[:, -1] if dim > 1 else np.full(len(faces), -1)
+    # Column indices of the d minors, and their cofactor signs.
+    minors = np.array([np.delete(np.arange(dim), c) for c in range(dim)])
+    signs = (-1.)**np.arange(dim)
+    generic = np.ones(size, dtype=bool)
+    alive = np.arange(size)
+    start = 0
+    while start < len(faces) and len(alive):
+        step = max(1, 2**22//(len(alive)*max(count, dim*dim)))
+        chunk = slice(start, start + step)
+        matrices = unit[alive][:, faces[chunk]][..., minors]
+        cofactors = signs*np.linalg.det(np.moveaxis(matrices, -2, -3))
+        dets = cofactors @ unit[alive].transpose(0, 2, 1)
+        tested = np.arange(count) > last[chunk][:, None]
+        ok = (np.abs(dets) > tol) | ~tested
+        degenerate = ~ok.all(axis=(1, 2))
+        generic[alive[degenerate]] = False
+        alive = alive[~degenerate]
+        start += step
+    return bool(generic[0]) if single else generic
+
+
+def generic_region_count(count, dim):
+    """Regions of N central hyperplanes in general position in R^d."""
+    return 2*sum(comb(count - 1, i) for i in range(dim))
+
+
+def arrangement_statistics(normals):
+    """Region counts and general position of a (B, N, d) batch."""
+    return {'regions': np.array([zaslavsky_count(n) for n in normals]),
+            'generic': general_position(normals)}
+
+
+def _statistics_job(args):
+    kind, size, count, dim, seed, options = args
+    return arrangement_statistics(generate(kind, size, count, dim, seed,
+                                           **options))
+
+
+def batch_statistics(kind, arrangements, count, dim, workers=1, seed=0,
+                     chunk=100, **options):
+    """Summary statistics of many random arrangements of one kind.
+
+    The arrangements are generated and counted `chunk` at a time, across
+    `workers` processes. Returns a JSON-able dict.
+    """
+    chunks = -(-arrangements//chunk)
+    seeds = np.random.SeedSequence(seed).spawn(chunks)
+    jobs = [(kind, min(chunk, arrangements - i*chunk), count, dim, s,
+             options) for i, s in enumerate(seeds)]
+    if workers <= 1:
+        parts = [_statistics_job(job) for job in jobs]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            parts = pool.map(_statistics_job, jobs)
+    regions = np.concatenate([part['regions'] for part in parts])
+    generic = np.concatenate([part['generic'] for part in parts])
+    hyperplanes = count if kind in ('uniform', 'lattice') else len(
+        root_normals(kind, dim))
+    return {'kind': kind, 'hyperplanes': hyperplanes, 'dim': dim,
+            'arrangements': arrangements,
+            'degeneracy_rate': float(1 - generic.mean()),
+            'regions_mean': float(regions.mean()),
+            'regions_min': int(regions.min()),
+            'regions_max': int(regions.max()),
+            'generic_regions': generic_region_count(hyperplanes, dim)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('kind', choices=KINDS)
+    parser.add_argument('-n', '--count', type=int, default=10,
+                        help='hyperplanes per arrangement (default: 10)')
+    parser.add_argument('-d', '--dim', type=int, default=3)
+    parser.add_argument('--arrangements', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scale', type=float, default=0.05,
+                        help='size of the perturbation of A, B and D')
+    parser.add_argument('--bound', type=int, default=2,
+                        help='largest lattice coordinate')
+    args = parser.parse_args(argv)
+    summary = batch_statistics(args.kind, args.arrangements, args.count,
+                               args.dim, args.workers, args.seed,
+                               scale=args.scale, bound=args.bound)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""Elements of finite reflection groups, their Cayley graph and Bruhat order.
+
+An element w is identified by w(rho), for a point rho inside the
+fundamental chamber C = {x : <x, a_i> > 0}: the orbit of rho is regular,
+so w(rho) determines w. Elements are generated by length. s_i w is longer
+than w exactly when <a_i, w(rho)> > 0, so the elements of length k + 1 are
+found from those of length k alone, a whole layer at a time.
+"""
+import numpy as np
+
+from root_systems import DECIMALS, positive_roots
+
+# Above this order the group is only walked layer by layer (layers()).
+MAX_ELEMENTS = 10**5
+
+
+class ReflectionGroup(object):
+    """The group generated by the reflections in the rows of `simple`."""
+
+    def __init__(self, simple, decimals=DECIMALS, max_elements=MAX_ELEMENTS):
+        self.simple = np.atleast_2d(np.asarray(simple, dtype=float))
+        self.rank, self.dim = self.simple.shape
+        self.decimals = decimals
+        self.max_elements = max_elements
+        self._scale = 2/np.einsum('ij,ij->i', self.simple, self.simple)
+        self.generators = (np.eye(self.dim)
+                           - self._scale[:, None, None]
+                           * np.einsum('ni,nj->nij', self.simple,
+                                       self.simple))
+        # <a_i, rho> = 1 for every i, with rho in the span of the roots.
+        self.rho = np.linalg.lstsq(self.simple, np.ones(self.rank),
+                                   rcond=None)[0]
+        self._elements = None
+        self._cayley = None
+        self._covers = None
+
+    def _keys(self, points):
+        rounded = np.ascontiguousarray(np.round(points, self.decimals) + 0.)
+        width = rounded.shape[-1]*rounded.itemsize
+        return rounded.view(np.dtype((np.void, width))).reshape(
+            rounded.shape[:-1])
+
+    def layers(self, with_matrices=True):
+        """Yield (points, words, matrices) for lengths 0, 1, 2, ...
+
+        points are the w(rho), words the reduced words as tuples of 0-based
+        generator indices (w = s_i1 s_i2 ...), matrices the (m, d, d)
+        matrices, or None without with_matrices. Only one layer is held
+        at a time.
+        """
+        points = self.rho[None]
+        words = [()]
+        matrices = np.eye(self.dim)[None] if with_matrices else None
+        while len(points):
+            yield points, words, matrices
+            values = points @ self.simple.T
+            parent, gen = np.nonzero(values > 10.**-self.decimals)
+            images = (points[parent] - (self._scale[gen]
+                                        * values[parent, gen])[:, None]
+                      * self.simple[gen])
+            _, first = np.unique(self._keys(images), return_index=True)
+            keep = np.sort(first)
+            parent, gen = parent[keep], gen[keep]
+            points = images[keep]
+            words = [(g,) + words[p] for p, g in zip(parent.tolist(),
+                                                     gen.tolist())]
+            if with_matrices:
+                matrices = np.matmul(self.generators[gen], matrices[parent])
+
+    def _enumerate(self):
+        if self._elements is None:
+            points, words, matrices, lengths = [], [], [], []
+            count = 0
+            for length, layer in enumerate(self.layers()):
+                count += len(layer[0])
+                if count > self.max_elements:
+                    raise ValueError('the group has more than %d elements; '
+                                     'walk it with layers() instead'
+                                     % self.max_elements)
+                points.append(layer[0])
+                words.extend(layer[1])
+                matrices.append(layer[2])
+                lengths.append(np.full(len(layer[0]), length))
+            points = np.vstack(points)
+            keys = self._keys(points)
+            order = np.argsort(keys)
+            self._elements = {
+                'points': points, 'words': words,
+                'matrices': np.concatenate(matrices),
+                'lengths': np.concatenate(lengths),
+                'keys': keys[order], 'order': order}
+        return self._elements
+
+    def __len__(self):
+        return len(self._enumerate()['points'])
+
+    @property
+    def words(self):
+        return self._enumerate()['words']
+
+    @property
+    def lengths(self):
+        return self._enumerate()['lengths']
+
+    @property
+    def matrices(self):
+        return self._enumerate()['matrices']
+
+    def lookup(self, points):
+        """Indices of the elements w with w(rho) at these points."""
+        elements = self._enumerate()
+        keys = self._keys(np.asarray(points, dtype=float))
+        found = np.searchsorted(elements['keys'], keys)
+        found = np.minimum(found, len(elements['keys']) - 1)
+        if np.any(elements['keys'][found] != keys):
+            raise KeyError('not an orbit point of rho')
+        return elements['order'][found]
+
+    def element(self, word):
+        """Index of the product of the generators in `word`."""
+        point = self.rho
+        for i in reversed(word):
+            point = self.generators[i] @ point
+        return int(self.lookup(point[None])[0])
+
+    def cayley_graph(self):
+        """(|W|, rank) array whose entry [k, i] is the index of s_i w_k."""
+        if self._cayley is None:
+            points = self._enumerate()['points']
+            images = np.einsum('nij,wj->wni', self.generators, points)
+            self._cayley = self.lookup(images)
+        return self._cayley
+
+    def bruhat_covers(self):
+        """(E, 2) pairs (u, w) of indices with u < w a Bruhat cover.
+
+        u is covered by w when u = w t for a reflection t and
+        l(u) = l(w) - 1; the products w t are done in one batch per chunk
+        of elements.
+        """
+        if self._covers is None:
+            elements = self._enumerate()
+            roots = positive_roots(self.simple, self.decimals)
+            scale = 2/np.einsum('ij,ij->i', roots, roots)
+            moved = self.rho - (scale*(roots @ self.rho))[:, None]*roots
+            lengths = elements['lengths']
+            covers = []
+            step = max(1, 2**22//(len(roots)*self.dim))
+            for start in range(0, len(lengths), step):
+                chunk = elements['matrices'][start:start + step]
+                below = self.lookup(np.einsum('wij,tj->wti', chunk, moved))
+                w = np.arange(start, start + len(chunk))[:, None]
+                mask = lengths[below] == lengths[w] - 1
+                covers.append(np.column_stack([below[mask],
+                                               np.broadcast_to(w, mask.shape)
+                                               [mask]]))
+            self._covers = np.vstack(covers)
+        return self._covers
+
+    def fundamental_triangles(self):
+        """Spherical triangles, (T, 3, 3) rays, covering C in R^3.
+
+        With rank 3 this is the triangle of fundamental weights; with rank
+        2 the chamber is a wedge around the line orthogonal to the roots,
+        split into its two halves.
+        """
+        if self.dim != 3 or self.rank not in (2, 3):
+            raise ValueError('only chambers of rank 2 or 3 groups in R^3 '
+                             'can be drawn')
+        weights = np.linalg.pinv(self.simple).T
+        if self.rank == 3:
+            return weights[None]
+        axis = np.cross(*self.simple)
+        axis /= np.linalg.norm(axis)
+        return np.array([[weights[0], weights[1], axis],
+                         [weights[0], weights[1], -axis]])
+
+    def bruhat_below(self, index):
+        """Indices of all u <= w_index in the Bruhat order."""
+        covers = self.bruhat_covers()
+        seen = {index}
+        frontier = [index]
+        while frontier:
+            lower = covers[np.isin(covers[:, 1], frontier), 0]
+            frontier = [u for u in np.unique(lower).tolist() if u not in seen]
+            seen.update(frontier)
+        return np.array(sorted(seen))
@@ -0,0 +1,165 @@
+"""Render arrangements to image files without a display.
+
+Usage::
+
+    python render_batch.py spec.json -o figures --format png --workers 4
+
+The spec is a JSON list of jobs (or an object with a "jobs" list). Each
+job has a "name" and one of
+
+    "normals": [[a, b, c], ...]   hyperplanes through the origin
+    "reflection": "B3"            reflecting hyperplanes of a Coxeter type
+    "dihedral": 7                 the dihedral arrangement with 7 lines
+
+plus optional "view": [azimuth, elevation]. Arrangements in R^3 are drawn
+as planes, those in R^2 as lines in the z = 0 plane.
+
+A job with a "to" entry (itself a job without a name) is rendered as an
+animation from its arrangement to that one, with "frames" (default 60)
+frames at "fps" (default 30), and saved as a GIF, or as the file type
+named by "format" (video formats need imageio-ffmpeg).
+
+Each worker process opens one offscreen figure and keeps its actors; jobs
+only push new points into them. --backend picks what draws the figure
+(backends.py): Mayavi by default, or matplotlib (png, svg, pdf) or a
+three.js page (html), neither of which needs VTK. The html pages embed
+the geometry but load three.js from a CDN, so viewing them needs network
+access (see HTMLBackend.three_url). The html backend writes animations
+as a single page too.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+from animation import keyframe_geometry
+from arrangement import Arrangement, dihedral_arrangement
+from backends import BACKENDS, default_view, get_backend
+from root_systems import deformation, reflecting_hyperplanes
+
+
+def job_normals(job):
+    if 'normals' in job:
+        return np.asarray(job['normals'], dtype=float)
+    if 'reflection' in job:
+        family, n = job['reflection'][0], int(job['reflection'][1:])
+        normals = reflecting_hyperplanes(family, n)
+        if normals.shape[1] != n:
+            # A_n lives in a hyperplane of R^(n+1); draw it in
+            # coordinates on the span of its roots.
+            normals, _ = deformation(family, n, (0,))
+        return normals
+    if 'dihedral' in job:
+        return dihedral_arrangement(int(job['dihedral']))['normals']
+    raise ValueError('job %r has no normals, reflection or dihedral entry'
+                     % job.get('name'))
+
+
+def load_spec(path):
+    with open(path) as f:
+        spec = json.load(f)
+    jobs = spec['jobs'] if isinstance(spec, dict) else spec
+    for i, job in enumerate(jobs):
+        job.setdefault('name', 'job_%03d' % i)
+    return jobs
+
+
+class BatchRenderer(object):
+    """One scene of a backend (see backends.py), reused from job to job."""
+
+    def __init__(self, size=(800, 600), backend='mayavi'):
+        self.backend = get_backend(backend, size)
+
+    def _kind(self, job, dim):
+        if dim not in (2, 3):
+            raise ValueError('job %r lives in R^%d; only R^2 and R^3 can be '
+                             'drawn' % (job['name'], dim))
+        return 'surfaces' if dim == 3 else 'lines'
+
+    def render(self, job, path):
+        arrangement = Arrangement(job_normals(job))
+        kind = self._kind(job, arrangement.dim)
+        pts, visible = getattr(arrangement, kind)(
+            resolution=self.backend.resolution)
+        pts[~visible] = 0.
+        self.backend.show(pts, view=job.get('view', default_view(pts)))
+        self.backend.save(path)
+        return path
+
+    def render_animation(self, job, path):
+        start, end = job_normals(job), job_normals(job['to'])
+        kind = self._kind(job, start.shape[1])
+        pts, visible = keyframe_geometry(start, end, job.get('frames', 60),
+                                         self.backend.resolution, kind)
+        pts[~visible] = 0.
+        self.backend.save_animation(pts, path, fps=job.get('fps', 30),
+                                    view=job.get('view',
+                                                 default_view(pts[0])))
+        return path
+
+
+_renderer = None
+
+
+def _init_worker(size, backend):
+    global _renderer
+    _renderer = BatchRenderer(size, backend)
+
+
+def _render_job(args):
+    job, path = args
+    if 'to' in job:
+        return _renderer.render_animation(job, path)
+    return _renderer.render(job, path)
+
+
+def render_all(jobs, out_dir, fmt='png', workers=1, size=(800, 600),
+               backend='mayavi'):
+    formats = BACKENDS[backend].formats
+    if fmt not in formats:
+        raise ValueError('the %s backend writes %s, not %s'
+                         % (backend, ', '.join(formats), fmt))
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = []
+    for job in jobs:
+        if 'to' in job:
+            ext = job.get('format', BACKENDS[backend].animation_format)
+        else:
+            ext = fmt
+        tasks.append((job, os.path.join(out_dir,
+                                        '%s.%s' % (job['name'], ext))))
+    if workers <= 1:
+        _init_worker(size, backend)
+        return [_render_job(task) for task in tasks]
+    with multiprocessing.Pool(workers, _init_worker,
+                              (size, backend)) as pool:
+        return list(pool.imap_unordered(_render_job, tasks))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('spec', help='JSON file listing the jobs')
+    parser.add_argument('-o', '--out', default='figures',
+                        help='output directory (default: figures)')
+    parser.add_argument('--backend', default='mayavi', choices=BACKENDS,
+                        help='mayavi (default), matplotlib or html')
+    parser.add_argument('--format', default=None,
+                        choices=('png', 'svg', 'pdf', 'html'),
+                        help="default: the backend's first format")
+    parser.add_argument('--workers', type=int, default=1,
+                        help='render processes, one figure each')
+    parser.add_argument('--size', type=int, nargs=2, default=(800, 600),
+                        metavar=('WIDTH', 'HEIGHT'))
+    args = parser.parse_args(argv)
+    fmt = args.format or BACKENDS[args.backend].formats[0]
+    paths = render_all(load_spec(args.spec), args.out, fmt, args.workers,
+                       tuple(args.size), args.backend)
+    for path in paths:
+        print(path)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
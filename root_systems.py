@@ -0,0 +1,277 @@
+"""Root systems and reflecting hyperplanes of finite Coxeter groups.
+
+The roots are generated from the simple roots by closing them under the
+simple reflections. Each round reflects the whole frontier by every
+simple root at once, and new roots are recognised through a hash set of
+their rounded coordinates.
+"""
+import numpy as np
+
+DECIMALS = 8
+
+
+def coxeter_matrix(family, n):
+    """The Coxeter matrix of the irreducible type `family`_n.
+
+    Families A-H follow Bourbaki's numbering; I is the dihedral group
+    I_2(n) of order 2n.
+    """
+    family = family.upper()
+    if family == 'I':
+        return np.array([[1, n], [n, 1]])
+    m = np.full((n, n), 2)
+    np.fill_diagonal(m, 1)
+
+    def edge(i, j, label=3):
+        m[i, j] = m[j, i] = label
+
+    if family in 'ABC':
+        if n < 1 or (family != 'A' and n < 2):
+            raise ValueError('type %s%d does not exist' % (family, n))
+        for i in range(n - 1):
+            edge(i, i + 1)
+        if family in 'BC':
+            edge(n - 2, n - 1, 4)
+    elif family == 'D':
+        if n < 4:
+            raise ValueError('type D%d does not exist' % n)
+        for i in range(n - 2):
+            edge(i, i + 1)
+        edge(n - 3, n - 1)
+    elif family == 'E':
+        if n not in (6, 7, 8):
+            raise ValueError('type E%d does not exist' % n)
+        edge(0, 2)
+        edge(1, 3)
+        for i in range(2, n - 1):
+            edge(i, i + 1)
+    elif family == 'F' and n == 4:
+        edge(0, 1)
+        edge(1, 2, 4)
+        edge(2, 3)
+    elif family == 'G' and n == 2:
+        edge(0, 1, 6)
+    elif family == 'H' and n in (3, 4):
+        edge(0, 1, 5)
+        for i in range(1, n - 1):
+            edge(i, i + 1)
+    else:
+        raise ValueError('type %s%d does not exist' % (family, n))
+    return m
+
+
+def simple_roots_from_matrix(matrix):
+    """Simple roots (as rows) realising a Coxeter or Cartan matrix.
+
+    A matrix with ones on the diagonal is read as a Coxeter matrix and
+    gives unit roots with <a_i, a_j> = -cos(pi/m_ij). One with twos on the
+    diagonal is read as a Cartan matrix, a_ij = 2<a_i, a_j>/<a_j, a_j>.
+    The roots are the rows of a Cholesky factor of their Gram matrix, so
+    they live in R^n.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    diagonal = np.diag(matrix)
+    if np.all(diagonal == 1):
+        with np.errstate(divide='ignore'):
+            gram = -np.cos(np.pi/matrix)
+        np.fill_diagonal(gram, 1.)
+    elif np.all(diagonal == 2):
+        gram = matrix*_root_lengths(matrix)[None, :]/2
+        gram = (gram + gram.T)/2
+    else:
+        raise ValueError('expected a Coxeter (unit diagonal) or Cartan '
+                         '(diagonal of twos) matrix')
+    try:
+        return np.linalg.cholesky(gram)
+    except np.linalg.LinAlgError:
+        raise ValueError('the matrix does not describe a finite group')
+
+
+def _root_lengths(cartan):
+    # Squared lengths with a_ij |a_j|^2 = a_ji |a_i|^2, one Dynkin component
+    # at a time, starting each at length^2 = 2.
+    n = len(cartan)
+    lengths = np.zeros(n)
+    for start in range(n):
+        if lengths[start]:
+            continue
+        lengths[start] = 2.
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            for j in np.nonzero(cartan[i])[0]:
+                if j != i and not lengths[j]:
+                    lengths[j] = cartan[j, i]*lengths[i]/cartan[i, j]
+                    stack.append(j)
+    return lengths
+
+
+def simple_roots(family, n):
+    """Simple roots of `family`_n, in the usual coordinates when there are.
+
+    A_n lives in R^(n+1), B_n, C_n, D_n and E_8 in the standard coordinates
+    of R^n and R^8; the other types come from their Coxeter matrix.
+    """
+    family = family.upper()
+    coxeter_matrix(family, n)  # validates the type
+    eye = np.eye(n + 1 if family == 'A' else n)
+    if family == 'A':
+        return eye[:-1] - eye[1:]
+    if family in 'BCD':
+        roots = eye[:-1] - eye[1:]
+        last = {'B': eye[-1], 'C': 2*eye[-1], 'D': eye[-2] + eye[-1]}
+        return np.vstack([roots, last[family]])
+    if family == 'E' and n == 8:
+        first = np.full(8, -.5)
+        first[[0, 7]] = .5
+        return np.vstack([first, eye[0] + eye[1],
+                          eye[1] - eye[0], eye[2:7] - eye[1:6]])
+    return simple_roots_from_matrix(coxeter_matrix(family, n))
+
+
+def _row_keys(rows, decimals):
+    # Adding 0. turns -0. into 0. so both round to the same bytes.
+    rounded = np.ascontiguousarray(np.round(rows, decimals) + 0.)
+    width = rounded.shape[1]*rounded.itemsize
+    data = rounded.tobytes()
+    return [data[i:i + width] for i in range(0, len(data), width)]
+
+
+def reflect(vectors, normals):
+    """Reflect every row of `vectors` in every hyperplane in `normals`.
+
+    Returns an array of shape (len(normals), len(vectors), d).
+    """
+    vectors = np.asarray(vectors, dtype=float)
+    normals = np.asarray(normals, dtype=float)
+    scale = 2/np.einsum('ij,ij->i', normals, normals)
+    coeffs = (vectors @ normals.T)*scale
+    return vectors[None, :, :] - coeffs.T[:, :, None]*normals[:, None, :]
+
+
+def root_system(simple, decimals=DECIMALS):
+    """All roots generated from `simple` by the simple reflections."""
+    simple = np.atleast_2d(np.asarray(simple, dtype=float))
+    seen = set(_row_keys(simple, decimals))
+    roots = [simple]
+    frontier = simple
+    while len(frontier):
+        images = reflect(frontier, simple).reshape(-1, simple.shape[1])
+        fresh = []
+        for i, key in enumerate(_row_keys(images, decimals)):
+            if key not in seen:
+                seen.add(key)
+                fresh.append(i)
+        frontier = images[fresh]
+        roots.append(frontier)
+    return np.vstack(roots)
+
+
+def positive_roots(simple, decimals=DECIMALS):
+    """Roots that are non-negative combinations of the simple roots."""
+    simple = np.atleast_2d(np.asarray(simple, dtype=float))
+    roots = root_system(simple, decimals)
+    coeffs = roots @ np.linalg.pinv(simple)
+    return roots[coeffs.sum(axis=1) > 0]
+
+
+def reflecting_hyperplanes(family, n):
+    """Normals of all reflecting hyperplanes of `family`_n."""
+    return positive_roots(simple_roots(family, n))
+
+
+def deformation(family, n, values):
+    """The hyperplanes <alpha, x> = k, alpha a positive root, k in values.
+
+    Returns normals and offsets in coordinates on the span of the roots,
+    so A_n comes out in R^n. values (0,) gives the reflection
+    arrangement, (0, 1) the Shi, (-1, 0, 1) the Catalan and (1,) the
+    Linial arrangement.
+    """
+    roots = reflecting_hyperplanes(family, n)
+    _, _, vt = np.linalg.svd(roots)
+    normals = roots @ vt[:n].T
+    values = np.asarray(values, dtype=float)
+    return (np.repeat(normals, len(values), axis=0),
+            np.tile(values, len(roots)))
+
+
+def exponents(family, n):
+    """The exponents m_1 <= ... <= m_n of the Coxeter group `family`_n."""
+    family = family.upper()
+    coxeter_matrix(family, n)  # validates the type
+    if family == 'A':
+        return list(range(1, n + 1))
+    if family in 'BC':
+        return list(range(1, 2*n, 2))
+    if family == 'D':
+        return sorted(list(range(1, 2*n - 2, 2)) + [n - 1])
+    if family == 'I':
+        return sorted([1, n - 1])
+    return {('E', 6): [1, 4, 5, 7, 8, 11],
+            ('E', 7): [1, 5, 7, 9, 11, 13, 17],
+            ('E', 8): [1, 7, 11, 13, 17, 19, 23, 29],
+            ('F', 4): [1, 5, 7, 11],
+            ('G', 2): [1, 5],
+            ('H', 3): [1, 5, 9],
+            ('H', 4): [1, 11, 19, 29]}[family, n]
+
+
+def coxeter_polynomial(family, n):
+    """Characteristic polynomial of the reflection arrangement of `family`_n.
+
+    It factors as t^k prod(t - m_i) over the exponents, where k is the
+    dimension the simple roots live in minus the rank (1 for A_n, else
+    0). Coefficients are highest degree first, as in combinatorics.
+    """
+    ambient = simple_roots(family, n).shape[1]
+    roots = exponents(family, n)
+    chi = np.round(np.poly(roots)).astype(np.int64)
+    return np.concatenate([chi, np.zeros(ambient - len(roots),
+                                         dtype=np.int64)])
+
+
+def chamber_word(simple, point):
+    """Reduced word of the w with `point` in w(C).
+
+    C is the fundamental chamber {x : <x, a_i> > 0} of the simple roots
+    a_i. Returns the 0-based indices [i_1, ..., i_k] of w = s_i1 ... s_ik:
+    while some <x, a_i> < 0, x is reflected in a_i, which shortens w.
+    The word is the lexicographically first reduced word of w.
+    """
+    simple = np.atleast_2d(np.asarray(simple, dtype=float))
+    x = np.array(point, dtype=float)
+    scale = 2/np.einsum('ij,ij->i', simple, simple)
+    word = []
+    while True:
+        values = simple @ x
+        # The signs are constant on a chamber, so taking the first
+        # negative one gives the same word for every point of it.
+        negative = np.nonzero(values < 0)[0]
+        if not len(negative):
+            return word
+        i = int(negative[0])
+        x -= scale[i]*values[i]*simple[i]
+        word.append(i)
+
+
+def chamber_walls(simple, word):
+    """Normals w(a_i) of the walls of the chamber w(C), as rows."""
+    simple = np.atleast_2d(np.asarray(simple, dtype=float))
+    walls = simple.copy()
+    for i in reversed(word):
+        walls = reflect(walls, simple[i:i + 1])[0]
+    return walls
+
+
+def format_word(word):
+    """'s1 s3 s2' for the 0-based word [0, 2, 1]; 'e' when empty."""
+    return ' '.join('s%d' % (i + 1) for i in word) or 'e'
+
+
+def fundamental_chamber(matrix):
+    """Bounding normals of the fundamental chamber of a Coxeter/Cartan matrix.
+
+    The chamber is {x : <x, a_i> > 0 for every row a_i}.
+    """
+    return simple_roots_from_matrix(matrix)
@@ -0,0 +1,35 @@
+"""Coalescing of trait-change notifications into one scene update."""
+
+
+class UpdateScheduler(object):
+    """Collect dirty flags and apply them once per event-loop tick.
+
+    `apply` is called with the set of flags marked since the last flush.
+    `invoke_later` defers a callable to the next tick of the event loop
+    (pyface's GUI.invoke_later in the app); without it every mark flushes
+    immediately, which is what headless callers want.
+    """
+
+    def __init__(self, apply, invoke_later=None):
+        self.apply = apply
+        self.invoke_later = invoke_later
+        self.dirty = set()
+        self.pending = False
+        self.flush_count = 0
+
+    def mark(self, *flags):
+        self.dirty.update(flags)
+        if self.pending:
+            return
+        self.pending = True
+        if self.invoke_later is None:
+            self.flush()
+        else:
+            self.invoke_later(self.flush)
+
+    def flush(self):
+        self.pending = False
+        dirty, self.dirty = self.dirty, set()
+        if dirty:
+            self.apply(dirty)
+            self.flush_count += 1
@@ -0,0 +1,131 @@
+"""Saving and restoring Vis sessions.
+
+A session is one uncompressed .npz file holding
+
+    'normals'   the (N, 3) hyperplane normals
+    'state'     the remaining traits, as a JSON string
+    'cache/<key>/<name>'  geometry arrays, grouped by content hash
+    'rows/<i>/<name>'     single-hyperplane meshes from the RowCache
+
+The geometry is keyed by a hash of the normals and the parameters it was
+computed with, so a reopened session can reuse any array whose inputs have
+not changed instead of recomputing it. The per-hyperplane rows are stored
+one group per (kind, extent, resolution): 'key' holds those as JSON,
+'rows' the normal and offset each mesh was computed for, and 'points' and
+'visible' the meshes themselves.
+"""
+import collections
+import hashlib
+import json
+
+import numpy as np
+
+SESSION_VERSION = 1
+
+
+def content_hash(normals, **params):
+    """Hex digest identifying `normals` together with keyword parameters."""
+    normals = np.ascontiguousarray(normals, dtype=float)
+    digest = hashlib.sha1()
+    digest.update(repr(normals.shape).encode())
+    digest.update(normals.tobytes())
+    digest.update(repr(sorted(params.items())).encode())
+    return digest.hexdigest()
+
+
+class GeometryCache(object):
+    """Least recently used store of geometry, keyed by content hash.
+
+    Each entry is a dict of arrays, e.g. {'points': ..., 'visible': ...}.
+    """
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return entry
+
+    def update(self, entries):
+        for key, entry in entries.items():
+            self.put(key, entry)
+
+
+def _row_groups(rows):
+    groups = collections.OrderedDict()
+    for (kind, extent, resolution, row), (points, visible) in \
+            rows.entries.items():
+        group = groups.setdefault((kind, extent, resolution), ([], [], []))
+        group[0].append(np.frombuffer(row))
+        group[1].append(points)
+        group[2].append(visible)
+    return groups
+
+
+def save_session(path, normals, state, cache=None, rows=None):
+    """Write normals, a JSON-able state dict and cached geometry to `path`.
+
+    `cache` is a GeometryCache and `rows` a RowCache; both are optional.
+    """
+    arrays = {'normals': np.asarray(normals, dtype=float),
+              'state': np.array(json.dumps(dict(state,
+                                                version=SESSION_VERSION)))}
+    if cache is not None:
+        for key, entry in cache.entries.items():
+            for name, value in entry.items():
+                arrays['cache/%s/%s' % (key, name)] = np.asarray(value)
+    if rows is not None:
+        for i, (key, (values, points, visible)) in enumerate(
+                _row_groups(rows).items()):
+            arrays['rows/%d/key' % i] = np.array(json.dumps(key))
+            arrays['rows/%d/rows' % i] = np.array(values)
+            arrays['rows/%d/points' % i] = np.array(points)
+            arrays['rows/%d/visible' % i] = np.array(visible, dtype=bool)
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+
+
+def load_session(path):
+    """Read a session file.
+
+    Returns (normals, state, cache entries, rows), where the rows are
+    (key, points, visible) triples ready for RowCache.put.
+    """
+    with np.load(path) as data:
+        state = json.loads(str(data['state']))
+        if state.pop('version', None) != SESSION_VERSION:
+            raise ValueError('%s is not a version %d session file'
+                             % (path, SESSION_VERSION))
+        normals = data['normals']
+        entries = {}
+        groups = {}
+        for name in data.files:
+            if name.startswith('cache/'):
+                _, key, field = name.split('/', 2)
+                entries.setdefault(key, {})[field] = data[name]
+            elif name.startswith('rows/'):
+                _, index, field = name.split('/', 2)
+                groups.setdefault(index, {})[field] = data[name]
+    rows = []
+    for group in groups.values():
+        prefix = tuple(json.loads(str(group['key'])))
+        for row, points, visible in zip(group['rows'], group['points'],
+                                        group['visible']):
+            rows.append((prefix + (row.tobytes(),), points, bool(visible)))
+    return normals, state, entries, rows
@@ -0,0 +1,21 @@
+import numpy as np
+
+from animation import keyframe_geometry
+
+
+def test_keyframes_keep_offsets():
+    start = np.array([[1., 0., 0.], [0., 0., 2.]])
+    end = np.array([[0., 1., 0.], [0., 0., -1.]])
+    start_offsets = np.array([3., 4.])
+    end_offsets = np.array([-5., -1.])
+    pts, visible = keyframe_geometry(start, end, 5, 10, 'surfaces',
+                                     start_offsets, end_offsets)
+    assert visible.all()
+    for frame, normals, offsets in ((0, start, start_offsets),
+                                    (-1, end, end_offsets)):
+        heights = np.einsum('nijk,nk->nij', pts[frame], normals)
+        np.testing.assert_allclose(heights,
+                                   offsets[:, None, None]*np.ones((10, 10)),
+                                   atol=1e-9)
+    # -z = -1 is z = 1, so z = 2 moves down to it, never through 0.
+    assert np.all(pts[:, 1, :, :, 2] > 0.9)
@@ -0,0 +1,28 @@
+import numpy as np
+
+from combinatorics import (IntersectionLattice, characteristic_polynomial,
+                           discriminantal, regions)
+
+
+def test_discriminantal_generic_vectors():
+    vectors = np.random.default_rng(0).normal(size=(5, 2))
+    normals = discriminantal(vectors)
+    # B(5, 2): one hyperplane per triple, in the quotient R^(5-2).
+    assert normals.shape == (10, 3)
+    assert np.all(np.linalg.norm(normals, axis=1) > 1e-8)
+    signs, _ = regions(normals, check=True)
+    assert len(signs) == 62
+
+
+def test_lattice_matches_characteristic_polynomial():
+    cases = [
+        [[1., 0., 0.]],
+        [[1., 0., 0.], [0., 1., 0.]],
+        [[1., 0., 0.], [0., 1., 0.], [1., 1., 0.]],
+        [[1., 0.], [0., 1.], [1., 1.]],
+        [[1., 0., 0.], [0., 1., 0.], [0., 0., 1.], [1., 1., 1.]],
+    ]
+    for normals in cases:
+        lattice = IntersectionLattice(normals)
+        assert (lattice.characteristic_polynomial().tolist()
+                == characteristic_polynomial(normals).tolist())
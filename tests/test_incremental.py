@@ -0,0 +1,30 @@
+import numpy as np
+
+from arrangement import Arrangement
+from incremental import Layer, RowCache
+
+
+def test_update_survives_evicted_hits():
+    normals = np.random.default_rng(0).normal(size=(6, 3))
+    arrangement = Arrangement(normals)
+    # Room for four fine rows: the coarse pass evicts two more, and
+    # putting the fine misses back evicts the rows that were hits.
+    fine, coarse = 8, 4
+    cache = RowCache(max_bytes=4*fine*fine*3*8)
+    layer = Layer('surfaces', cache)
+    expected, _ = arrangement.surfaces(resolution=fine)
+    for resolution in (fine, coarse, fine):
+        buffer = np.zeros((6, resolution, resolution, 3))
+        visible, _ = layer.update(arrangement, buffer, resolution=resolution)
+    assert visible.all()
+    np.testing.assert_allclose(buffer, expected)
+
+
+def test_only_edited_rows_are_rewritten():
+    normals = np.random.default_rng(1).normal(size=(5, 3))
+    layer = Layer('surfaces')
+    buffer = np.zeros((5, 8, 8, 3))
+    layer.update(Arrangement(normals), buffer, resolution=8)
+    normals[2, 0] += 0.5
+    _, stale = layer.update(Arrangement(normals), buffer, resolution=8)
+    assert stale.tolist() == [2]
@@ -0,0 +1,14 @@
+import numpy as np
+
+from random_arrangements import general_position
+
+
+def test_general_position_empty():
+    assert general_position(np.zeros((0, 3)))
+    assert general_position(np.zeros((4, 0, 3))).tolist() == [True]*4
+
+
+def test_general_position_degenerate():
+    assert general_position(np.eye(3))
+    assert not general_position([[1, 0, 0], [0, 1, 0], [1, 1, 0]])
+    assert not general_position([[1, 0, 0], [2, 0, 0]])
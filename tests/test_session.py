@@ -0,0 +1,33 @@
+import numpy as np
+
+from arrangement import Arrangement
+from incremental import Layer, RowCache
+from session import GeometryCache, load_session, save_session
+
+
+def test_rows_survive_a_session(tmp_path, monkeypatch):
+    normals = np.random.default_rng(0).normal(size=(4, 3))
+    arrangement = Arrangement(normals)
+    rows = RowCache()
+    buffer = np.zeros((4, 20, 20, 3))
+    Layer('surfaces', rows).update(arrangement, buffer, resolution=20)
+
+    path = str(tmp_path / 'session.npz')
+    save_session(path, normals, {'dim': '3'}, GeometryCache(), rows)
+    loaded, state, entries, saved = load_session(path)
+    assert state == {'dim': '3'}
+    assert len(saved) == len(rows)
+
+    restored = RowCache()
+    for key, points, visible in saved:
+        restored.put(key, points, visible)
+    assert list(restored.entries) == list(rows.entries)
+    # Every row is found in the cache, so nothing is recomputed.
+
+    def recompute(*args, **kwargs):
+        raise AssertionError('saved rows were recomputed')
+    monkeypatch.setattr(Arrangement, 'surfaces', recompute)
+    again = np.zeros_like(buffer)
+    Layer('surfaces', restored).update(Arrangement(loaded), again,
+                                       resolution=20)
+    np.testing.assert_array_equal(again, buffer)